@@ -1,151 +1,197 @@
 """
 Programs endpoints
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Optional, Sequence
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.core.database import get_db
-from app.core.deps import get_current_student, get_optional_current_user
+from app.core.deps import get_current_student, load_optional_user, optional_security
 from app.models.user import User
 from app.models.student_profile import StudentProfile
 from app.models.program import Program, ProgramSubject
-from app.models.riasec_test import RiasecTest
-from app.models.academic_grade import AcademicGrade
-from app.models.professional_value import ProfessionalValue
+from app.utils.scoring import (
+    COMPATIBILITY_PROFILE,
+    StudentContext,
+    WeightProfile,
+    eligible_program_ids,
+    get_catalog_matrix,
+    rank_programs,
+    score_program,
+    score_programs
+)
 from app.schemas.program import (
     ProgramListItem, ProgramDetail, ProgramSearchParams,
-    ProgramCompatibility, CompatibilityScore, ProgramStatistics,
-    ProgramListResponse
+    ProgramCompatibility, CompatibilityScore, CompatibilityComponents,
+    CompatibilityBatchRequest, CompatibilityBatchResponse,
+    ProgramStatistics, ProgramListResponse, ProgramFacets, SimilarProgram
+)
+from app.utils.catalog_snapshot import (
+    SEARCH_LIMIT,
+    CatalogSnapshot,
+    decode_cursor,
+    encode_cursor,
+    get_catalog_snapshot
 )
+from app.utils.http_cache import check_not_modified, make_etag
+from app.utils.program_statistics import program_statistics_cache
+from app.utils.similarity import MAX_SIMILAR, get_similarity_index
 
 router = APIRouter(prefix="/programs", tags=["Academic Programs"])
 
 
-def calculate_riasec_compatibility(student_code: str, program_code: str) -> int:
+def build_compatibility(
+    program: Program,
+    profile: StudentProfile,
+    context: StudentContext,
+    component_scores: Dict[str, int],
+    weights: WeightProfile = COMPATIBILITY_PROFILE
+) -> ProgramCompatibility:
     """
-    Calculate RIASEC compatibility between student and program
+    Build the detailed compatibility breakdown of one program
 
-    Returns score 0-100 based on matching positions
+    - **component_scores**: kernel output (riasec, grades, values,
+      employment, financial, total)
     """
-    if not student_code or not program_code:
-        return 0
+    riasec_score = component_scores["riasec"]
+    grades_score = component_scores["grades"]
+    values_score = component_scores["values"]
+    employment_score = component_scores["employment"]
+    financial_score = component_scores["financial"]
+
+    scores = [
+        CompatibilityScore(
+            criterion="RIASEC Match",
+            score=riasec_score,
+            weight=weights.riasec,
+            weighted_score=riasec_score * weights.riasec,
+            details=f"Votre code Holland ({context.holland_code or 'N/A'}) vs Programme ({program.riasec_match})"
+        ),
+        CompatibilityScore(
+            criterion="Résultats académiques",
+            score=grades_score,
+            weight=weights.grades,
+            weighted_score=grades_score * weights.grades,
+            details=f"Note bac: {profile.bac_grade}/20, Requis: {program.min_bac_grade}/20"
+        ),
+        CompatibilityScore(
+            criterion="Valeurs professionnelles",
+            score=values_score,
+            weight=weights.values,
+            weighted_score=values_score * weights.values,
+            details="Alignement entre vos valeurs et le profil du programme"
+        ),
+        CompatibilityScore(
+            criterion="Perspectives d'emploi",
+            score=employment_score,
+            weight=weights.employment,
+            weighted_score=employment_score * weights.employment,
+            details=f"Taux d'emploi: {program.employment_rate}%"
+        ),
+        CompatibilityScore(
+            criterion="Accessibilité financière",
+            score=financial_score,
+            weight=weights.financial,
+            weighted_score=financial_score * weights.financial,
+            details=f"Frais annuels: {program.annual_tuition:,} FCFA, Budget: {profile.max_annual_budget:,} FCFA" if profile.max_annual_budget else f"Frais: {program.annual_tuition:,} FCFA"
+        ),
+    ]
 
-    score = 0
+    # Determine ranking
+    total_score_int = component_scores["total"]
+    if total_score_int >= 80:
+        ranking = "Fortement recommandé"
+    elif total_score_int >= 65:
+        ranking = "Recommandé"
+    elif total_score_int >= 50:
+        ranking = "À considérer"
+    else:
+        ranking = "Non recommandé"
 
-    # Exact match on first position: 60 points
-    if len(student_code) > 0 and len(program_code) > 0:
-        if student_code[0] == program_code[0]:
-            score += 60
+    # Generate strengths and weaknesses
+    strengths = []
+    weaknesses = []
 
-    # Match on second position: 30 points
-    if len(student_code) > 1 and len(program_code) > 1:
-        if student_code[1] == program_code[1]:
-            score += 30
-        elif student_code[0] == program_code[1]:
-            score += 20  # First in student matches second in program
+    for score_item in scores:
+        if score_item.score >= 70:
+            strengths.append(f"{score_item.criterion}: {score_item.score}%")
+        elif score_item.score < 50:
+            weaknesses.append(f"{score_item.criterion}: {score_item.score}%")
 
-    # Match on third position: 10 points
-    if len(student_code) > 2 and len(program_code) > 2:
-        if student_code[2] == program_code[2]:
-            score += 10
-        elif student_code[1] == program_code[2]:
-            score += 5
+    # Generate advice
+    advice = f"Avec un score de {total_score_int}%, ce programme est {ranking.lower()}. "
+    if total_score_int >= 80:
+        advice += "Vos profil et intérêts correspondent très bien à ce programme. C'est un excellent choix!"
+    elif total_score_int >= 65:
+        advice += "Ce programme correspond bien à votre profil. Nous vous encourageons à postuler."
+    elif total_score_int >= 50:
+        advice += "Ce programme pourrait vous convenir, mais examinez attentivement les points faibles identifiés."
+    else:
+        advice += "Ce programme ne semble pas optimal pour votre profil. Considérez d'autres options mieux adaptées."
 
-    return min(score, 100)
+    # Create components object from individual scores
+    components = CompatibilityComponents(
+        riasec_score=riasec_score,
+        riasec_weight=weights.riasec,
+        grades_score=grades_score,
+        grades_weight=weights.grades,
+        values_score=values_score,
+        values_weight=weights.values,
+        employment_score=employment_score,
+        employment_weight=weights.employment,
+        financial_score=financial_score,
+        financial_weight=weights.financial
+    )
 
+    return ProgramCompatibility(
+        program_id=program.id,
+        program_code=program.code,
+        program_name=program.name,
+        total_score=total_score_int,
+        ranking=ranking,
+        scores=scores,
+        components=components,
+        strengths=strengths if strengths else ["Aucun point fort majeur identifié"],
+        weaknesses=weaknesses if weaknesses else ["Aucune faiblesse majeure identifiée"],
+        advice=advice
+    )
 
-def calculate_grades_compatibility(student_profile: StudentProfile, program: Program, db: Session) -> int:
-    """
-    Calculate academic grades compatibility
 
-    Returns score 0-100 based on grades and required subjects
-    """
-    # Check bac grade
-    if not student_profile.bac_grade or not program.min_bac_grade:
-        return 50  # Neutral score if no data
-
-    bac_score = 0
-    if student_profile.bac_grade >= program.min_bac_grade:
-        # Above minimum: scale from 50-100
-        if student_profile.bac_grade >= 15:
-            bac_score = 100
-        elif student_profile.bac_grade >= program.min_bac_grade + 2:
-            bac_score = 80
-        else:
-            bac_score = 60
-    else:
-        # Below minimum: scale from 0-49
-        gap = program.min_bac_grade - student_profile.bac_grade
-        bac_score = max(0, 50 - (gap * 10))
-
-    # Check subject grades
-    subject_score = 50  # Default
-    if program.required_subjects:
-        grades = db.query(AcademicGrade).filter(
-            AcademicGrade.student_id == student_profile.id,
-            AcademicGrade.subject.in_(program.required_subjects)
-        ).all()
-
-        if grades:
-            avg_grade = sum(g.grade for g in grades) / len(grades)
-            if avg_grade >= 15:
-                subject_score = 100
-            elif avg_grade >= 12:
-                subject_score = 80
-            elif avg_grade >= 10:
-                subject_score = 60
-            else:
-                subject_score = 40
-
-    # Combined score (70% bac, 30% subjects)
-    return int(bac_score * 0.7 + subject_score * 0.3)
-
-
-def calculate_values_compatibility(student_profile: StudentProfile, program: Program, db: Session) -> int:
+def build_program_page(
+    snapshot: CatalogSnapshot,
+    program_ids: Sequence[str],
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> ProgramListResponse:
     """
-    Calculate professional values compatibility
+    One page of ``program_ids`` (default order) with the next page's cursor
 
-    Returns score 0-100 based on values alignment
+    - **cursor**: start after this cursor instead of at ``offset``
     """
-    values = db.query(ProfessionalValue).filter(
-        ProfessionalValue.student_id == student_profile.id
-    ).first()
-
-    if not values:
-        return 50  # Neutral if no values data
-
-    # Map RIASEC to values preferences
-    # This is a simplified heuristic
-    riasec_values_map = {
-        "R": {"autonomy": 0.3, "job_security": 0.3, "salary": 0.2, "variety": 0.2},
-        "I": {"autonomy": 0.4, "creativity": 0.3, "prestige": 0.2, "variety": 0.1},
-        "A": {"creativity": 0.5, "autonomy": 0.3, "variety": 0.2},
-        "S": {"helping_others": 0.5, "work_life_balance": 0.3, "job_security": 0.2},
-        "E": {"prestige": 0.4, "salary": 0.3, "autonomy": 0.2, "variety": 0.1},
-        "C": {"job_security": 0.4, "work_life_balance": 0.3, "salary": 0.2, "prestige": 0.1}
-    }
-
-    primary_code = program.riasec_match[0] if program.riasec_match else "R"
-    value_weights = riasec_values_map.get(primary_code, {})
-
-    # Calculate weighted score
-    total_score = 0
-    total_weight = 0
+    start = offset
+    if cursor:
+        try:
+            start = snapshot.cursor_start(program_ids, decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
 
-    for value_name, weight in value_weights.items():
-        student_value = getattr(values, value_name, 3)  # Default 3/5
-        # Normalize to 0-100
-        normalized = (student_value - 1) / 4 * 100  # 1-5 scale to 0-100
-        total_score += normalized * weight
-        total_weight += weight
+    programs = snapshot.page(program_ids, start, limit)
+    next_cursor = None
+    if programs and start + limit < len(program_ids):
+        next_cursor = encode_cursor(snapshot.sort_keys[programs[-1].id])
 
-    return int(total_score / total_weight) if total_weight > 0 else 50
+    return ProgramListResponse(programs=programs, total=len(program_ids), next_cursor=next_cursor)
 
 
 @router.get("", response_model=ProgramListResponse)
 async def list_programs(
+    response: Response,
     level: Optional[str] = Query(None, description="Filter by level"),
     domain: Optional[str] = Query(None, description="Filter by domain"),
     department: Optional[str] = Query(None, description="Filter by department"),
@@ -153,6 +199,11 @@ async def list_programs(
     max_budget: Optional[int] = Query(None, description="Filter by max annual budget"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     limit: int = Query(50, ge=1, le=100, description="Limit results"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
+    sort: Optional[str] = Query(None, pattern="^compatibility$", description="Sort order ('compatibility')"),
+    eligible_only: bool = Query(False, description="Only programs the student meets the prerequisites of"),
+    if_none_match: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db)
 ):
     """
@@ -162,112 +213,137 @@ async def list_programs(
     - **department**: Filter by department
     - **riasec_code**: Filter by RIASEC match (1-3 letters)
     - **max_budget**: Filter programs with annual_tuition <= max_budget
-    - **skip**: Pagination offset
+    - **sort**: "compatibility" ranks programs by the logged-in student's
+      compatibility score (default: department, then name)
+    - **eligible_only**: keep the programs whose bac series and minimum bac
+      grade the logged-in student meets
+    - **offset**: Pagination offset
+    - **cursor**: Keyset pagination on (department, name, id): pass the
+      previous page's **next_cursor**; every page costs the same. Not
+      available with sort=compatibility
     - **limit**: Maximum results (1-100)
-    """
-    query = db.query(Program).options(joinedload(Program.master_program)).filter(Program.is_active == True)
-
-    if level:
-        query = query.filter(Program.level == level)
-
-    if domain:
-        query = query.filter(Program.domain == domain)
 
-    if department:
-        query = query.filter(Program.department.ilike(f"%{department}%"))
-
-    if riasec_code:
-        # Match programs where riasec_match starts with or contains riasec_code
-        query = query.filter(Program.riasec_match.like(f"{riasec_code}%"))
+    Unpersonalized listings carry an ETag of the catalog version and answer
+    304 to a matching **If-None-Match**.
+    """
+    # Filtering and pagination are served from the in-memory catalog snapshot
+    snapshot = get_catalog_snapshot(db)
+    if sort is None and not eligible_only:
+        check_not_modified(response, make_etag(snapshot.version), if_none_match)
+    program_ids = snapshot.filter_ids(level, domain, department, riasec_code, max_budget)
+
+    # Personalized listing is only available to students with a profile
+    # (the user is only looked up here: a 304 never touches the database)
+    profile = None
+    if sort == "compatibility" or eligible_only:
+        current_user = load_optional_user(db, credentials)
+        if current_user and current_user.role == "student":
+            profile = db.query(StudentProfile).filter(
+                StudentProfile.user_id == current_user.id
+            ).first()
+
+    if sort == "compatibility" and profile and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is only available in the default order"
+        )
 
-    if max_budget:
-        query = query.filter(Program.annual_tuition <= max_budget)
+    if not profile:
+        return build_program_page(snapshot, program_ids, offset, limit, cursor)
 
-    # Get total count
-    total = query.count()
+    catalog = get_catalog_matrix(db)
 
-    # Apply sorting with SQLAlchemy order_by (more reliable than Python sorted)
-    query = query.order_by(Program.department, Program.name)
+    if sort == "compatibility":
+        context = StudentContext.load(db, profile)
+    else:
+        # Prerequisites only need profile fields
+        context = StudentContext.from_profile(profile, None, [], None)
 
-    # Apply pagination
-    programs = query.offset(offset).limit(limit).all()
+    if eligible_only:
+        program_ids = eligible_program_ids(catalog, context, program_ids)
 
-    # Convert to Pydantic models explicitly to ensure master_program is serialized
-    program_items = [ProgramListItem.model_validate(p) for p in programs]
+    if sort != "compatibility":
+        return build_program_page(snapshot, program_ids, offset, limit, cursor)
 
-    return ProgramListResponse(programs=program_items, total=total)
+    program_items = [
+        snapshot.items[program_id].model_copy(update={"compatibility_score": total_score})
+        for program_id, total_score in rank_programs(catalog, context, program_ids, offset + limit)[offset:]
+    ]
+    return ProgramListResponse(programs=program_items, total=len(program_ids))
 
 
 @router.get("/search", response_model=List[ProgramListItem])
 async def search_programs(
+    response: Response,
     q: str = Query(..., min_length=2, description="Search query"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=100, description="Limit results"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Search programs by name, code, or description
+    Search programs by name, code, description or department
 
     - **q**: Search query (minimum 2 characters)
+    - **offset**, **limit**: Pagination
 
-    Searches in: program name, code, description, and department
+    Accent and case insensitive, every word must match (as a word or a word
+    prefix). Results are ranked by relevance: name and code matches weigh
+    more than department, then description. The total number of matches is
+    returned in the **X-Total-Count** header.
     """
-    search_term = f"%{q}%"
-
-    programs = db.query(Program).filter(
-        Program.is_active == True,
-        (
-            Program.name.ilike(search_term) |
-            Program.code.ilike(search_term) |
-            Program.description.ilike(search_term) |
-            Program.department.ilike(search_term)
-        )
-    ).order_by(Program.name).limit(50).all()
-
+    snapshot = get_catalog_snapshot(db)
+    check_not_modified(response, make_etag(snapshot.version), if_none_match)
+    programs, total = snapshot.search(q, offset, limit)
+    response.headers["X-Total-Count"] = str(total)
     return programs
 
 
+@router.get("/facets", response_model=ProgramFacets)
+async def get_program_facets(
+    response: Response,
+    level: Optional[str] = Query(None, description="Filter by level"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    riasec_code: Optional[str] = Query(None, description="Filter by RIASEC code"),
+    max_budget: Optional[int] = Query(None, description="Filter by max annual budget"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Counts for the filter sidebar of GET /programs
+
+    Takes the same filters as the listing and returns, for every level,
+    domain, department and budget ceiling, the number of active programs
+    the listing would return with that value selected (the facet's own
+    filter is replaced, the others kept), plus the current **total**.
+    """
+    snapshot = get_catalog_snapshot(db)
+    check_not_modified(response, make_etag(snapshot.version), if_none_match)
+    return snapshot.facets(level, domain, department, riasec_code, max_budget)
+
+
 @router.get("/statistics", response_model=ProgramStatistics)
-async def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Get program statistics
 
     Returns counts by level, department, and averages
     """
-    programs = db.query(Program).filter(Program.is_active == True).all()
-
-    # Count by level
-    by_level = {}
-    for p in programs:
-        by_level[p.level] = by_level.get(p.level, 0) + 1
-
-    # Count by department
-    by_department = {}
-    for p in programs:
-        by_department[p.department] = by_department.get(p.department, 0) + 1
-
-    # RIASEC distribution (first letter)
-    riasec_dist = {}
-    for p in programs:
-        first_letter = p.riasec_match[0] if p.riasec_match else "Unknown"
-        riasec_dist[first_letter] = riasec_dist.get(first_letter, 0) + 1
-
-    # Averages
-    avg_tuition = sum(p.annual_tuition for p in programs) / len(programs) if programs else 0
-    programs_with_employment = [p for p in programs if p.employment_rate is not None]
-    avg_employment = sum(p.employment_rate for p in programs_with_employment) / len(programs_with_employment) if programs_with_employment else 0
-
-    return ProgramStatistics(
-        total_programs=len(programs),
-        by_level=by_level,
-        by_department=by_department,
-        average_tuition=avg_tuition,
-        average_employment_rate=avg_employment,
-        riasec_distribution=riasec_dist
-    )
+    version, statistics = program_statistics_cache.get(db)
+    check_not_modified(response, make_etag(version), if_none_match)
+    return statistics
 
 
 @router.get("/{program_id}", response_model=ProgramDetail)
 async def get_program_detail(
     program_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -277,7 +353,8 @@ async def get_program_detail(
 
     Returns complete program information including subjects
     """
-    program = db.query(Program).filter(Program.id == program_id).first()
+    snapshot = get_catalog_snapshot(db)
+    program = snapshot.details.get(program_id)
 
     if not program:
         raise HTTPException(
@@ -285,38 +362,46 @@ async def get_program_detail(
             detail="Program not found"
         )
 
-    # Convert to dict and format datetime fields
-    program_dict = {
-        "id": program.id,
-        "code": program.code,
-        "name": program.name,
-        "university": program.university,
-        "level": program.level,
-        "domain": program.domain,
-        "duration_years": program.duration_years,
-        "department": program.department,
-        "description": program.description,
-        "objectives": program.objectives,
-        "career_prospects": program.career_prospects,
-        "required_bac_series": program.required_bac_series,
-        "min_bac_grade": program.min_bac_grade,
-        "required_subjects": program.required_subjects,
-        "riasec_match": program.riasec_match,
-        "registration_fee": program.registration_fee,
-        "annual_tuition": program.annual_tuition,
-        "total_cost_3years": program.total_cost_3years,
-        "employment_rate": program.employment_rate,
-        "average_starting_salary": program.average_starting_salary,
-        "capacity": program.capacity,
-        "is_active": program.is_active,
-        "master_program_id": program.master_program_id,
-        "master_program": program.master_program,
-        "subjects": program.subjects,
-        "created_at": program.created_at.isoformat(),
-        "updated_at": program.updated_at.isoformat()
-    }
+    check_not_modified(response, make_etag(snapshot.version), if_none_match)
+    return program
 
-    return program_dict
+
+@router.get("/{program_id}/similar", response_model=List[SimilarProgram])
+async def get_similar_programs(
+    program_id: str,
+    response: Response,
+    limit: int = Query(6, ge=1, le=MAX_SIMILAR, description="Number of similar programs"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the active programs most similar to a program, best first
+
+    Similarity combines RIASEC profile, domain, level, cost, employment rate
+    and taught subjects. Neighbours are precomputed per catalog version.
+    """
+    snapshot = get_catalog_snapshot(db)
+    if program_id not in snapshot.items:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+
+    check_not_modified(response, make_etag(snapshot.version), if_none_match)
+    similar = get_similarity_index(db).similar(program_id, limit)
+
+    if similar is None:
+        # Not indexed: inactive program (no neighbours)
+        return []
+
+    return [
+        SimilarProgram(
+            **snapshot.items[similar_id].model_dump(),
+            similarity_score=similarity_score
+        )
+        for similar_id, similarity_score in similar
+        if similar_id in snapshot.items
+    ]
 
 
 @router.get("/{program_id}/compatibility", response_model=ProgramCompatibility)
@@ -356,148 +441,55 @@ async def check_program_compatibility(
             detail="Profile not found"
         )
 
-    # Get latest RIASEC test
-    riasec_test = db.query(RiasecTest).filter(
-        RiasecTest.student_id == profile.id
-    ).order_by(RiasecTest.created_at.desc()).first()
-
-    # Calculate scores
-    scores = []
-    total_score = 0
-
-    # 1. RIASEC compatibility (30%)
-    riasec_score = 50  # Default
-    if riasec_test:
-        riasec_score = calculate_riasec_compatibility(riasec_test.holland_code, program.riasec_match)
-
-    riasec_weighted = riasec_score * 0.3
-    total_score += riasec_weighted
-    scores.append(CompatibilityScore(
-        criterion="RIASEC Match",
-        score=riasec_score,
-        weight=0.3,
-        weighted_score=riasec_weighted,
-        details=f"Votre code Holland ({riasec_test.holland_code if riasec_test else 'N/A'}) vs Programme ({program.riasec_match})"
-    ))
-
-    # 2. Academic grades (25%)
-    grades_score = calculate_grades_compatibility(profile, program, db)
-    grades_weighted = grades_score * 0.25
-    total_score += grades_weighted
-    scores.append(CompatibilityScore(
-        criterion="Résultats académiques",
-        score=grades_score,
-        weight=0.25,
-        weighted_score=grades_weighted,
-        details=f"Note bac: {profile.bac_grade}/20, Requis: {program.min_bac_grade}/20"
-    ))
-
-    # 3. Professional values (20%)
-    values_score = calculate_values_compatibility(profile, program, db)
-    values_weighted = values_score * 0.2
-    total_score += values_weighted
-    scores.append(CompatibilityScore(
-        criterion="Valeurs professionnelles",
-        score=values_score,
-        weight=0.2,
-        weighted_score=values_weighted,
-        details="Alignement entre vos valeurs et le profil du programme"
-    ))
-
-    # 4. Employment prospects (15%)
-    employment_score = program.employment_rate if program.employment_rate else 50
-    employment_weighted = employment_score * 0.15
-    total_score += employment_weighted
-    scores.append(CompatibilityScore(
-        criterion="Perspectives d'emploi",
-        score=employment_score,
-        weight=0.15,
-        weighted_score=employment_weighted,
-        details=f"Taux d'emploi: {program.employment_rate}%"
-    ))
-
-    # 5. Financial feasibility (10%)
-    financial_score = 50  # Default
-    if profile.max_annual_budget:
-        if program.annual_tuition <= profile.max_annual_budget:
-            # Affordable
-            financial_score = 100
-        elif program.annual_tuition <= profile.max_annual_budget * 1.2:
-            # Slightly over budget
-            financial_score = 70
-        elif program.annual_tuition <= profile.max_annual_budget * 1.5:
-            # Moderately over budget
-            financial_score = 40
-        else:
-            # Significantly over budget
-            financial_score = 20
-
-    financial_weighted = financial_score * 0.1
-    total_score += financial_weighted
-    scores.append(CompatibilityScore(
-        criterion="Accessibilité financière",
-        score=financial_score,
-        weight=0.1,
-        weighted_score=financial_weighted,
-        details=f"Frais annuels: {program.annual_tuition:,} FCFA, Budget: {profile.max_annual_budget:,} FCFA" if profile.max_annual_budget else f"Frais: {program.annual_tuition:,} FCFA"
-    ))
+    # Load latest RIASEC test, grades and values once
+    context = StudentContext.load(db, profile)
 
-    # Determine ranking
-    total_score_int = int(total_score)
-    if total_score_int >= 80:
-        ranking = "Fortement recommandé"
-    elif total_score_int >= 65:
-        ranking = "Recommandé"
-    elif total_score_int >= 50:
-        ranking = "À considérer"
-    else:
-        ranking = "Non recommandé"
+    # All five components from the shared scoring kernel
+    component_scores = score_program(program, context, COMPATIBILITY_PROFILE)
 
-    # Generate strengths and weaknesses
-    strengths = []
-    weaknesses = []
+    return build_compatibility(program, profile, context, component_scores)
 
-    for score_item in scores:
-        if score_item.score >= 70:
-            strengths.append(f"{score_item.criterion}: {score_item.score}%")
-        elif score_item.score < 50:
-            weaknesses.append(f"{score_item.criterion}: {score_item.score}%")
 
-    # Generate advice
-    advice = f"Avec un score de {total_score_int}%, ce programme est {ranking.lower()}. "
-    if total_score_int >= 80:
-        advice += "Vos profil et intérêts correspondent très bien à ce programme. C'est un excellent choix!"
-    elif total_score_int >= 65:
-        advice += "Ce programme correspond bien à votre profil. Nous vous encourageons à postuler."
-    elif total_score_int >= 50:
-        advice += "Ce programme pourrait vous convenir, mais examinez attentivement les points faibles identifiés."
-    else:
-        advice += "Ce programme ne semble pas optimal pour votre profil. Considérez d'autres options mieux adaptées."
+@router.post("/compatibility/batch", response_model=CompatibilityBatchResponse)
+async def check_programs_compatibility_batch(
+    request: CompatibilityBatchRequest,
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """
+    Check compatibility with many programs in one call
 
-    # Create components object from individual scores
-    from app.schemas.program import CompatibilityComponents
-    components = CompatibilityComponents(
-        riasec_score=riasec_score,
-        riasec_weight=0.3,
-        grades_score=grades_score,
-        grades_weight=0.25,
-        values_score=values_score,
-        values_weight=0.2,
-        employment_score=employment_score,
-        employment_weight=0.15,
-        financial_score=financial_score,
-        financial_weight=0.1
+    Loads the student's RIASEC test, grades and values once and scores every
+    requested program in a single vectorized pass. Results follow the order
+    of **program_ids**; unknown ids are listed in **not_found**.
+    """
+    # Get student profile
+    profile = db.query(StudentProfile).filter(
+        StudentProfile.user_id == current_user.id
+    ).first()
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    # Deduplicate while keeping the requested order
+    program_ids = list(dict.fromkeys(request.program_ids))
+    programs = {
+        p.id: p for p in db.query(Program).filter(Program.id.in_(program_ids)).all()
+    }
+
+    context = StudentContext.load(db, profile)
+    component_scores = score_programs(
+        get_catalog_matrix(db), context, list(programs.values()), COMPATIBILITY_PROFILE
     )
 
-    return ProgramCompatibility(
-        program_id=program.id,
-        program_code=program.code,
-        program_name=program.name,
-        total_score=total_score_int,
-        ranking=ranking,
-        scores=scores,
-        components=components,
-        strengths=strengths if strengths else ["Aucun point fort majeur identifié"],
-        weaknesses=weaknesses if weaknesses else ["Aucune faiblesse majeure identifiée"],
-        advice=advice
+    return CompatibilityBatchResponse(
+        results=[
+            build_compatibility(programs[pid], profile, context, component_scores[pid])
+            for pid in program_ids
+            if pid in programs
+        ],
+        not_found=[pid for pid in program_ids if pid not in programs]
     )
@@ -1,45 +1,248 @@
 """
 Recommendations endpoints
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc
 
 from app.core.database import get_db
 from app.core.deps import get_current_student
 from app.models.user import User
 from app.models.student_profile import StudentProfile
-from app.models.recommendation import Recommendation
+from app.models.recommendation import Recommendation, RecommendationScoreVector
 from app.models.program import Program
-from app.models.riasec_test import RiasecTest
-from app.models.professional_value import ProfessionalValue
 from app.schemas.recommendation import (
     RecommendationResponse,
     RecommendationWithDetails,
-    GenerateRecommendationsRequest
+    RecommendationStatusResponse,
+    GenerateRecommendationsRequest,
+    SimulateRecommendationsRequest,
+    SimulatedRecommendation
 )
-from app.schemas.program import ProgramListItem
-
-# Import compatibility calculation functions from programs endpoint
-from app.api.v1.endpoints.programs import (
-    calculate_riasec_compatibility,
-    calculate_grades_compatibility,
-    calculate_values_compatibility
+from app.schemas.program import MasterProgramBrief, ProgramListItem
+from app.utils.recommendation_jobs import latest_recommendation, recommendation_status
+from app.utils.recommendation_store import (
+    build_rows,
+    build_score_vector,
+    lock_students,
+    replace_recommendations
+)
+from app.utils.scoring import (
+    MAX_RECOMMENDATIONS,
+    StudentContext,
+    candidate_rows,
+    filter_rows,
+    get_catalog_matrix,
+    input_fingerprint,
+    recommend_for_student,
+    score_candidates,
+    unpack_scores
 )
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
 
+def load_recommendations(db: Session, student_id: str, fingerprint: Optional[str] = None) -> List[Recommendation]:
+    """
+    Load a student's recommendations best first, with their programs and
+    linked master programs eager-loaded in the same query
+
+    - **fingerprint**: only return a set computed from these exact inputs
+    """
+    query = db.query(Recommendation).options(
+        joinedload(Recommendation.program).joinedload(Program.master_program)
+    ).filter(Recommendation.student_id == student_id)
+
+    if fingerprint:
+        query = query.filter(Recommendation.input_fingerprint == fingerprint)
+
+    return query.order_by(desc(Recommendation.total_score), Recommendation.ranking).all()
+
+
+def load_programs_by_id(db: Session, program_ids: List[str]) -> Dict[str, Program]:
+    """Load programs and their master programs in one query, keyed by id"""
+    if not program_ids:
+        return {}
+
+    programs = db.query(Program).options(
+        joinedload(Program.master_program)
+    ).filter(Program.id.in_(program_ids)).all()
+    return {p.id: p for p in programs}
+
+
+def build_program_item(program: Program) -> ProgramListItem:
+    """Build the program summary of a recommendation, with its master program"""
+    # Associated master program if exists
+    master_program_data = None
+    if program.master_program_id and program.master_program:
+        master_program = program.master_program
+        master_program_data = MasterProgramBrief(
+            id=master_program.id,
+            code=master_program.code,
+            name=master_program.name,
+            duration_years=master_program.duration_years
+        )
+
+    return ProgramListItem(
+        id=program.id,
+        code=program.code,
+        name=program.name,
+        university=program.university,
+        level=program.level,
+        domain=program.domain,
+        duration_years=program.duration_years,
+        department=program.department,
+        riasec_match=program.riasec_match,
+        registration_fee=program.registration_fee,
+        annual_tuition=program.annual_tuition,
+        employment_rate=program.employment_rate,
+        capacity=program.capacity,
+        is_active=program.is_active,
+        master_program_id=program.master_program_id,
+        master_program=master_program_data
+    )
+
+
+def build_recommendation_item(rec, program: Program) -> RecommendationWithDetails:
+    """
+    Build the API representation of a recommendation and its program
+
+    - **rec**: Recommendation object or row returned by the bulk insert
+    """
+    return RecommendationWithDetails(
+        id=rec.id,
+        student_profile_id=rec.student_id,
+        program_id=rec.program_id,
+        ranking=rec.ranking,
+        total_score=rec.total_score,
+        riasec_score=rec.riasec_score,
+        grades_score=rec.grades_score,
+        values_score=rec.values_score,
+        employment_score=rec.employment_score,
+        financial_score=rec.financial_score,
+        strengths=rec.strengths if rec.strengths else [],
+        weaknesses=rec.weaknesses if rec.weaknesses else [],
+        advice=rec.advice if rec.advice else "",
+        created_at=rec.created_at.isoformat(),
+        compatibility_score=rec.total_score,
+        recommendations=rec.strengths if rec.strengths else [],
+        program=build_program_item(program)
+    )
+
+
+def filter_recommendations(
+    db: Session,
+    context: StudentContext,
+    stored: List[Recommendation],
+    level: Optional[str],
+    domain: Optional[str],
+    max_budget: Optional[int],
+    limit: int
+) -> List[RecommendationWithDetails]:
+    """
+    Re-rank the whole catalog for a student under program filters
+
+    Uses the stored score vector when it was computed from the current
+    inputs, so filtering never rescores. Programs of the stored set keep
+    their recommendation id; the others are not persisted and have none.
+    """
+    if not context.holland_code or not context.values:
+        # Nothing can be ranked: filter the stored set
+        return [
+            build_recommendation_item(rec, rec.program)
+            for rec in stored
+            if rec.program
+            and (not level or rec.program.level == level)
+            and (not domain or rec.program.domain == domain)
+            and (not max_budget or rec.program.annual_tuition <= max_budget)
+        ][:limit]
+
+    catalog = get_catalog_matrix(db)
+    vector = db.query(RecommendationScoreVector).filter(
+        RecommendationScoreVector.student_id == context.student_id,
+        RecommendationScoreVector.input_fingerprint == input_fingerprint(catalog, context)
+    ).first()
+
+    if vector and vector.program_count == catalog.size:
+        scores = unpack_scores(vector.scores, catalog.size)
+    else:
+        # Never generated or inputs changed since: score on the fly
+        scores = score_candidates(catalog, context)
+
+    rows = filter_rows(catalog, candidate_rows(catalog, context), level, domain, max_budget)
+    entries = recommend_for_student(catalog, context, limit, rows=rows, scores=scores)
+
+    stored_ids = {rec.program_id: rec.id for rec in stored}
+    programs = load_programs_by_id(db, [entry["program_id"] for entry in entries])
+
+    items = []
+    for row in build_rows(context.student_id, entries):
+        if row["program_id"] in programs:
+            row["id"] = stored_ids.get(row["program_id"])
+            items.append(build_recommendation_item(SimpleNamespace(**row), programs[row["program_id"]]))
+    return items
+
+
 @router.get("", response_model=List[RecommendationWithDetails])
 async def get_recommendations(
+    level: Optional[str] = Query(None, description="Filter by program level"),
+    domain: Optional[str] = Query(None, description="Filter by program domain"),
+    max_budget: Optional[int] = Query(None, description="Filter by max annual budget"),
+    limit: int = Query(MAX_RECOMMENDATIONS, ge=1, le=100, description="Limit results when filtering"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_student)
 ):
     """
     Get all recommendations for the current student
 
-    Returns recommendations sorted by total score (best first)
+    Returns recommendations sorted by total score (best first). Whether
+    they are fresh, stale or still being computed in the background is
+    reported by GET /recommendations/status.
+
+    With **level**, **domain** or **max_budget**, the whole catalog is
+    re-ranked under those filters from the stored per-program scores
+    (no rescoring) and the best **limit** programs are returned.
+    """
+    # Get student profile
+    student_profile = db.query(StudentProfile).filter(
+        StudentProfile.user_id == current_user.id
+    ).first()
+
+    if not student_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student profile not found"
+        )
+
+    # Recommendations, programs and master programs in a single query
+    recommendations = load_recommendations(db, student_profile.id)
+
+    if level or domain or max_budget:
+        context = StudentContext.load(db, student_profile)
+        return filter_recommendations(db, context, recommendations, level, domain, max_budget, limit)
+
+    return [
+        build_recommendation_item(rec, rec.program)
+        for rec in recommendations
+        if rec.program
+    ]
+
+
+@router.get("/status", response_model=RecommendationStatusResponse)
+async def get_recommendations_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_student)
+):
+    """
+    Freshness of the current student's recommendations
+
+    - **fresh**: computed from the current test, grades, values and catalog
+    - **computing**: a background recomputation is running
+    - **stale**: inputs changed since they were computed
+    - **empty**: nothing stored yet
     """
     # Get student profile
     student_profile = db.query(StudentProfile).filter(
@@ -52,74 +255,16 @@ async def get_recommendations(
             detail="Student profile not found"
         )
 
-    # Get recommendations with program details
-    recommendations = db.query(Recommendation).filter(
+    latest = latest_recommendation(db, student_profile.id)
+    count = db.query(Recommendation).filter(
         Recommendation.student_id == student_profile.id
-    ).order_by(desc(Recommendation.total_score)).all()
-
-    # Build response with program details
-    result = []
-    for rec in recommendations:
-        # Get program details
-        program = db.query(Program).filter(Program.id == rec.program_id).first()
-
-        if not program:
-            continue
-
-        # Load associated master program if exists
-        master_program_data = None
-        if program.master_program_id:
-            master_program = db.query(Program).filter(Program.id == program.master_program_id).first()
-            if master_program:
-                from app.schemas.program import MasterProgramBrief
-                master_program_data = MasterProgramBrief(
-                    id=master_program.id,
-                    code=master_program.code,
-                    name=master_program.name,
-                    duration_years=master_program.duration_years
-                )
-
-        # Convert to response format
-        rec_data = {
-            "id": rec.id,
-            "student_profile_id": rec.student_id,
-            "program_id": rec.program_id,
-            "ranking": rec.ranking,
-            "total_score": rec.total_score,
-            "riasec_score": rec.riasec_score,
-            "grades_score": rec.grades_score,
-            "values_score": rec.values_score,
-            "employment_score": rec.employment_score,
-            "financial_score": rec.financial_score,
-            "strengths": rec.strengths if rec.strengths else [],
-            "weaknesses": rec.weaknesses if rec.weaknesses else [],
-            "advice": rec.advice if rec.advice else "",
-            "created_at": rec.created_at.isoformat(),
-            "compatibility_score": rec.total_score,
-            "recommendations": rec.strengths if rec.strengths else [],
-            "program": ProgramListItem(
-                id=program.id,
-                code=program.code,
-                name=program.name,
-                university=program.university,
-                level=program.level,
-                domain=program.domain,
-                duration_years=program.duration_years,
-                department=program.department,
-                riasec_match=program.riasec_match,
-                registration_fee=program.registration_fee,
-                annual_tuition=program.annual_tuition,
-                employment_rate=program.employment_rate,
-                capacity=program.capacity,
-                is_active=program.is_active,
-                master_program_id=program.master_program_id,
-                master_program=master_program_data
-            )
-        }
-
-        result.append(RecommendationWithDetails(**rec_data))
-
-    return result
+    ).count() if latest else 0
+
+    return RecommendationStatusResponse(
+        status=recommendation_status(db, student_profile, latest),
+        count=count,
+        computed_at=latest.created_at.isoformat() if latest and latest.created_at else None
+    )
 
 
 @router.post("/generate", response_model=List[RecommendationWithDetails])
@@ -131,8 +276,9 @@ async def generate_recommendations(
     """
     Generate new recommendations for the current student
 
-    This endpoint will be implemented with the recommendation algorithm
-    For now, it returns existing recommendations
+    Returns the stored set immediately when none of the scoring inputs
+    (profile, grades, values, RIASEC code, catalog, algorithm) changed since
+    it was computed. Use **force_regenerate** to recompute anyway.
     """
     # Get student profile
     student_profile = db.query(StudentProfile).filter(
@@ -145,258 +291,152 @@ async def generate_recommendations(
             detail="Student profile not found"
         )
 
-    # Get RIASEC test results
-    riasec_test = db.query(RiasecTest).filter(
-        RiasecTest.student_id == student_profile.id
-    ).first()
+    # Load RIASEC test, grades and values once for the whole scoring pass
+    context = StudentContext.load(db, student_profile)
 
-    if not riasec_test:
+    if not context.holland_code:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Vous devez compléter le test RIASEC avant de générer des recommandations"
         )
 
     # Check if professional values exist
-    values = db.query(ProfessionalValue).filter(
-        ProfessionalValue.student_id == student_profile.id
-    ).first()
-
-    if not values:
+    if not context.values:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Vous devez compléter vos valeurs professionnelles avant de générer des recommandations"
         )
 
-    # Delete existing recommendations for this student
-    db.query(Recommendation).filter(
-        Recommendation.student_id == student_profile.id
-    ).delete()
-    db.commit()
-
-    # Get all active programs - filter by level based on user type
-    programs_query = db.query(Program).filter(Program.is_active == True)
+    # Score the whole catalog in one vectorized pass
+    catalog = get_catalog_matrix(db)
 
     # For new bachelor students, recommend Licence and Ingenieur programs
     # They will see the associated Master as a continuation option for Licence
-    if student_profile.user_type == "new_bachelor":
-        programs_query = programs_query.filter(Program.level.in_(["Licence", "Ingenieur"]))
-
-    programs = programs_query.all()
-
-    if not programs:
+    candidates = candidate_rows(catalog, context)
+    if candidates.size == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aucun programme disponible"
         )
 
-    # Calculate compatibility scores for each program
-    program_scores = []
+    # Every writer (this endpoint, background and fleet jobs, PDF fallback)
+    # stores the top MAX_RECOMMENDATIONS; request.limit only trims the response
+    fingerprint = input_fingerprint(catalog, context)
+
+    # Nothing changed since the stored set was computed: return it as is
+    # (a student with fewer candidates gets them all)
+    def cached_items() -> Optional[List[RecommendationWithDetails]]:
+        cached = load_recommendations(db, student_profile.id, fingerprint)
+        if cached and len(cached) >= min(MAX_RECOMMENDATIONS, candidates.size):
+            return [
+                build_recommendation_item(rec, rec.program)
+                for rec in cached[:request.limit]
+                if rec.program
+            ]
+        return None
+
+    if not request.force_regenerate:
+        items = cached_items()
+        if items is not None:
+            return items
+
+    # Serialize with a background recomputation of the same student: once
+    # it committed, its set may be the one we were about to write
+    lock_students(db, [student_profile.id])
+    if not request.force_regenerate:
+        items = cached_items()
+        if items is not None:
+            db.commit()
+            return items
+
+    # Score every candidate program once: the top entries are stored as
+    # recommendations, all scores in the packed vector used for filtering
+    scores = score_candidates(catalog, context)
+    entries = recommend_for_student(catalog, context, MAX_RECOMMENDATIONS, scores=scores)
+
+    # Replace the previous recommendations in one transaction
+    inserted = replace_recommendations(
+        db,
+        [student_profile.id],
+        build_rows(student_profile.id, entries, input_fingerprint=fingerprint),
+        score_vectors=[build_score_vector(student_profile.id, catalog, scores, fingerprint)]
+    )
 
-    for program in programs:
-        # Calculate individual scores
-        riasec_score = calculate_riasec_compatibility(
-            riasec_test.holland_code,
-            program.riasec_match
-        )
+    # Build response from the inserted rows (already ranked)
+    programs = load_programs_by_id(db, [rec.program_id for rec in inserted])
+
+    return [
+        build_recommendation_item(rec, programs[rec.program_id])
+        for rec in inserted[:request.limit]
+        if rec.program_id in programs
+    ]
 
-        grades_score = calculate_grades_compatibility(
-            student_profile,
-            program,
-            db
-        )
 
-        values_score = calculate_values_compatibility(
-            student_profile,
-            program,
-            db
+@router.post("/simulate", response_model=List[SimulatedRecommendation])
+async def simulate_recommendations(
+    request: SimulateRecommendationsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_student)
+):
+    """
+    Rank the catalog for the current student with some inputs replaced
+
+    What-if scoring ("bac grade 2 points higher", "budget doubled"): the
+    overridden profile fields, professional values or Holland code only
+    live in memory for this request. Nothing is written to the database
+    and stored recommendations are left as they are.
+    """
+    student_profile = db.query(StudentProfile).filter(
+        StudentProfile.user_id == current_user.id
+    ).first()
+
+    if not student_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student profile not found"
         )
 
-        # Calculate employment score (0-100 based on employment_rate)
-        employment_score = int(program.employment_rate) if program.employment_rate else 50
-
-        # Calculate financial score based on tuition vs student budget
-        financial_score = 50  # Default neutral
-        if student_profile.max_annual_budget and program.annual_tuition:
-            try:
-                max_budget = student_profile.max_annual_budget
-
-                if program.annual_tuition <= max_budget * 0.7:
-                    financial_score = 100  # Well within budget
-                elif program.annual_tuition <= max_budget:
-                    financial_score = 80  # Within budget
-                elif program.annual_tuition <= max_budget * 1.2:
-                    financial_score = 60  # Slightly over budget
-                else:
-                    financial_score = 30  # Significantly over budget
-            except:
-                financial_score = 50
-
-        # Calculate total score (weighted average)
-        total_score = int(
-            riasec_score * 0.30 +      # 30% RIASEC compatibility
-            grades_score * 0.30 +       # 30% Academic performance
-            values_score * 0.20 +       # 20% Values alignment
-            employment_score * 0.15 +   # 15% Employment prospects
-            financial_score * 0.05      # 5% Financial feasibility
+    try:
+        context = StudentContext.load(db, student_profile).with_overrides(
+            values=request.values.model_dump() if request.values else None,
+            holland_code=request.holland_code,
+            bac_grade=request.bac_grade,
+            bac_series=request.bac_series,
+            max_annual_budget=request.max_annual_budget,
+            user_type=request.user_type
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
 
-        # Generate strengths, weaknesses, and advice
-        strengths = []
-        weaknesses = []
-
-        if riasec_score >= 70:
-            strengths.append(f"Excellente compatibilité de personnalité ({riasec_score}%)")
-        elif riasec_score >= 50:
-            strengths.append(f"Bonne compatibilité de personnalité ({riasec_score}%)")
-        else:
-            weaknesses.append(f"Compatibilité de personnalité limitée ({riasec_score}%)")
-
-        if grades_score >= 70:
-            strengths.append(f"Votre profil académique est très adapté ({grades_score}%)")
-        elif grades_score >= 50:
-            strengths.append(f"Votre profil académique est adapté ({grades_score}%)")
-        else:
-            weaknesses.append(f"Votre profil académique pourrait nécessiter un effort supplémentaire ({grades_score}%)")
-
-        if values_score >= 70:
-            strengths.append(f"Alignement fort avec vos valeurs professionnelles ({values_score}%)")
-        elif values_score < 50:
-            weaknesses.append(f"Alignement limité avec vos valeurs professionnelles ({values_score}%)")
-
-        if employment_score >= 70:
-            strengths.append(f"Excellent taux d'insertion professionnelle ({employment_score}%)")
-        elif employment_score < 50:
-            weaknesses.append(f"Taux d'insertion professionnelle à considérer ({employment_score}%)")
-
-        if financial_score >= 80:
-            strengths.append("Les frais sont bien adaptés à votre budget")
-        elif financial_score < 50:
-            weaknesses.append("Les frais dépassent votre budget prévu")
-
-        # Generate advice
-        advice = ""
-        if total_score >= 75:
-            advice = "Cette formation est fortement recommandée pour votre profil. Elle correspond bien à vos aspirations et capacités."
-        elif total_score >= 60:
-            advice = "Cette formation est recommandée pour votre profil. Assurez-vous de bien comprendre les exigences."
-        elif total_score >= 45:
-            advice = "Cette formation pourrait vous convenir, mais nécessite une attention particulière aux domaines moins compatibles."
-        else:
-            advice = "Cette formation présente des défis importants par rapport à votre profil. Explorez d'autres options mieux adaptées."
-
-        program_scores.append({
-            "program": program,
-            "total_score": total_score,
-            "riasec_score": riasec_score,
-            "grades_score": grades_score,
-            "values_score": values_score,
-            "employment_score": employment_score,
-            "financial_score": financial_score,
-            "strengths": strengths,
-            "weaknesses": weaknesses,
-            "advice": advice
-        })
-
-    # Sort by total score (best first)
-    program_scores.sort(key=lambda x: x["total_score"], reverse=True)
-
-    # Create recommendations for top programs (limit to request.limit or 20)
-    recommendations_to_create = program_scores[:min(request.limit, 20)]
-
-    created_recommendations = []
-    for idx, score_data in enumerate(recommendations_to_create, start=1):
-        recommendation = Recommendation(
-            student_id=student_profile.id,
-            program_id=score_data["program"].id,
-            ranking=idx,
-            total_score=score_data["total_score"],
-            riasec_score=score_data["riasec_score"],
-            grades_score=score_data["grades_score"],
-            values_score=score_data["values_score"],
-            employment_score=score_data["employment_score"],
-            financial_score=score_data["financial_score"],
-            strengths=score_data["strengths"],
-            weaknesses=score_data["weaknesses"],
-            advice=score_data["advice"],
-            algorithm_version="1.0"
+    if not context.holland_code:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vous devez compléter le test RIASEC ou indiquer un code Holland pour simuler des recommandations"
         )
-        db.add(recommendation)
-        created_recommendations.append(recommendation)
 
-    db.commit()
+    if not context.values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vous devez compléter vos valeurs professionnelles ou les indiquer pour simuler des recommandations"
+        )
 
-    # Refresh to get IDs and relationships
-    for rec in created_recommendations:
-        db.refresh(rec)
+    # In-memory pass over the cached catalog, only the candidate programs are scored
+    catalog = get_catalog_matrix(db)
+    entries = recommend_for_student(catalog, context, min(request.limit, MAX_RECOMMENDATIONS))
+    programs = load_programs_by_id(db, [entry["program_id"] for entry in entries])
 
-    # Get recommendations with program details
-    recommendations = db.query(Recommendation).filter(
-        Recommendation.student_id == student_profile.id
-    ).order_by(desc(Recommendation.total_score)).limit(request.limit).all()
-
-    # Build response with program details
-    result = []
-    for rec in recommendations:
-        # Get program details
-        program = db.query(Program).filter(Program.id == rec.program_id).first()
-
-        if not program:
-            continue
-
-        # Load associated master program if exists
-        master_program_data = None
-        if program.master_program_id:
-            master_program = db.query(Program).filter(Program.id == program.master_program_id).first()
-            if master_program:
-                from app.schemas.program import MasterProgramBrief
-                master_program_data = MasterProgramBrief(
-                    id=master_program.id,
-                    code=master_program.code,
-                    name=master_program.name,
-                    duration_years=master_program.duration_years
-                )
-
-        # Convert to response format
-        rec_data = {
-            "id": rec.id,
-            "student_profile_id": rec.student_id,
-            "program_id": rec.program_id,
-            "ranking": rec.ranking,
-            "total_score": rec.total_score,
-            "riasec_score": rec.riasec_score,
-            "grades_score": rec.grades_score,
-            "values_score": rec.values_score,
-            "employment_score": rec.employment_score,
-            "financial_score": rec.financial_score,
-            "strengths": rec.strengths if rec.strengths else [],
-            "weaknesses": rec.weaknesses if rec.weaknesses else [],
-            "advice": rec.advice if rec.advice else "",
-            "created_at": rec.created_at.isoformat(),
-            "compatibility_score": rec.total_score,
-            "recommendations": rec.strengths if rec.strengths else [],
-            "program": ProgramListItem(
-                id=program.id,
-                code=program.code,
-                name=program.name,
-                university=program.university,
-                level=program.level,
-                domain=program.domain,
-                duration_years=program.duration_years,
-                department=program.department,
-                riasec_match=program.riasec_match,
-                registration_fee=program.registration_fee,
-                annual_tuition=program.annual_tuition,
-                employment_rate=program.employment_rate,
-                capacity=program.capacity,
-                is_active=program.is_active,
-                master_program_id=program.master_program_id,
-                master_program=master_program_data
-            )
-        }
-
-        result.append(RecommendationWithDetails(**rec_data))
-
-    return result
+    return [
+        SimulatedRecommendation(
+            ranking=ranking,
+            program=build_program_item(programs[entry["program_id"]]),
+            **entry
+        )
+        for ranking, entry in enumerate(entries, start=1)
+        if entry["program_id"] in programs
+    ]
 
 
 @router.get("/{recommendation_id}", response_model=RecommendationResponse)
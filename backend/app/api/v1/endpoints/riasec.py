@@ -1,9 +1,10 @@
 """
 RIASEC test endpoints
 """
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -13,14 +14,15 @@ from app.models.user import User
 from app.models.student_profile import StudentProfile
 from app.models.riasec_test import RiasecTest, RiasecDimension, RiasecQuestion, RiasecTestDraft
 from app.models.recommendation import Recommendation
-from app.models.program import Program
-from app.models.professional_value import ProfessionalValue
 from app.schemas.riasec import (
     RiasecTestQuestionsResponse, RiasecDimensionResponse, RiasecQuestionResponse,
     RiasecSubmit, RiasecResultResponse, RiasecScores, RiasecInterpretation,
     RiasecHistoryItem, RiasecCareerMatch, RiasecDraftSave, RiasecDraftResponse
 )
+from app.utils.http_cache import check_not_modified, make_etag
 from app.utils.pdf_generator import generate_riasec_pdf
+from app.utils.recommendation_jobs import schedule_recommendations
+from app.utils.versioned_cache import VersionedCache
 
 router = APIRouter(prefix="/riasec", tags=["RIASEC Test"])
 
@@ -177,14 +179,22 @@ def get_holland_code(scores: Dict[str, int]) -> str:
     return holland_code
 
 
-@router.get("/questions", response_model=RiasecTestQuestionsResponse)
-async def get_test_questions(db: Session = Depends(get_db)):
-    """
-    Get RIASEC test questions
+def questions_version(db: Session) -> Tuple:
+    """Cheap version stamp of the test dimensions and questions (no timestamps on them)"""
+    dimensions = db.query(
+        func.count(RiasecDimension.id),
+        func.sum(func.length(RiasecDimension.name) + func.length(RiasecDimension.description))
+    ).one()
+    questions = db.query(
+        func.count(RiasecQuestion.id),
+        func.sum(func.length(RiasecQuestion.text)),
+        func.sum(RiasecQuestion.reverse_scored)
+    ).one()
+    return tuple(dimensions) + tuple(questions)
 
-    Returns all 30 questions with dimensions and answer scale.
-    No authentication required - test is public.
-    """
+
+def load_test_questions(db: Session) -> RiasecTestQuestionsResponse:
+    """Build the RIASEC test questions response"""
     # Get all dimensions
     dimensions = db.query(RiasecDimension).all()
 
@@ -203,9 +213,31 @@ async def get_test_questions(db: Session = Depends(get_db)):
     )
 
 
+# The test content only changes when the seed script runs
+_questions_cache = VersionedCache(questions_version, load_test_questions)
+
+
+@router.get("/questions", response_model=RiasecTestQuestionsResponse)
+async def get_test_questions(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get RIASEC test questions
+
+    Returns all 30 questions with dimensions and answer scale.
+    No authentication required - test is public.
+    """
+    version, questions = _questions_cache.get(db)
+    check_not_modified(response, make_etag(version), if_none_match)
+    return questions
+
+
 @router.post("/submit", response_model=RiasecResultResponse, status_code=status.HTTP_201_CREATED)
 async def submit_test(
     test_data: RiasecSubmit,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -214,6 +246,7 @@ async def submit_test(
 
     Requires exactly 30 answers (one for each question).
     Calculates scores, Holland Code, and provides interpretations.
+    Recommendations are recomputed in the background once the answer is sent.
 
     - **answers**: List of 30 answers with question_number (1-30) and answer (1-5)
     - **duration_seconds**: Optional test duration in seconds
@@ -270,6 +303,9 @@ async def submit_test(
     db.commit()
     db.refresh(riasec_test)
 
+    # New Holland code: have recommendations ready before they are requested
+    schedule_recommendations(background_tasks, profile.id)
+
     # Get dimensions for interpretations
     dimensions = db.query(RiasecDimension).all()
     dimensions_map = {d.code: d for d in dimensions}
@@ -454,111 +490,49 @@ async def download_latest_result_pdf(
     # Si aucune recommandation n'existe, essayer de les générer automatiquement
     if not recommendations:
         try:
-            from app.api.v1.endpoints.programs import (
-                calculate_riasec_compatibility,
-                calculate_grades_compatibility,
-                calculate_values_compatibility
+            from app.utils.scoring import (
+                StudentContext,
+                get_catalog_matrix,
+                input_fingerprint,
+                recommend_for_student,
+                score_candidates
             )
-
-            # Vérifier si les valeurs professionnelles existent
-            values = db.query(ProfessionalValue).filter(
-                ProfessionalValue.student_id == profile.id
-            ).first()
-
-            # Récupérer les programmes actifs
-            programs_query = db.query(Program).filter(Program.is_active == True)
-            if profile.user_type == "new_bachelor":
-                programs_query = programs_query.filter(Program.level.in_(["Licence", "Ingenieur"]))
-            all_programs = programs_query.all()
-
-            if all_programs:
-                # Supprimer les anciennes recommandations (même celles < 50)
-                db.query(Recommendation).filter(
-                    Recommendation.student_id == profile.id
-                ).delete()
-
-                program_scores = []
-                for prog in all_programs:
-                    riasec_score = calculate_riasec_compatibility(
-                        riasec_test.holland_code,
-                        prog.riasec_match
-                    )
-
-                    grades_score = calculate_grades_compatibility(profile, prog, db) if values else 50
-                    values_score = calculate_values_compatibility(profile, prog, db) if values else 50
-
-                    employment_score = int(prog.employment_rate) if prog.employment_rate else 50
-
-                    financial_score = 50
-                    if profile.max_annual_budget and prog.annual_tuition:
-                        try:
-                            if prog.annual_tuition <= profile.max_annual_budget * 0.7:
-                                financial_score = 100
-                            elif prog.annual_tuition <= profile.max_annual_budget:
-                                financial_score = 80
-                            elif prog.annual_tuition <= profile.max_annual_budget * 1.2:
-                                financial_score = 60
-                            else:
-                                financial_score = 30
-                        except Exception:
-                            financial_score = 50
-
-                    total_score = int(
-                        riasec_score * 0.30 +
-                        grades_score * 0.30 +
-                        values_score * 0.20 +
-                        employment_score * 0.15 +
-                        financial_score * 0.05
-                    )
-
-                    program_scores.append({
-                        "program": prog,
-                        "total_score": total_score,
-                        "riasec_score": riasec_score,
-                        "grades_score": grades_score,
-                        "values_score": values_score,
-                        "employment_score": employment_score,
-                        "financial_score": financial_score,
-                    })
-
-                program_scores.sort(key=lambda x: x["total_score"], reverse=True)
-
-                for idx, score_data in enumerate(program_scores[:20], start=1):
-                    recommendation = Recommendation(
-                        student_id=profile.id,
-                        program_id=score_data["program"].id,
-                        ranking=idx,
-                        total_score=score_data["total_score"],
-                        riasec_score=score_data["riasec_score"],
-                        grades_score=score_data["grades_score"],
-                        values_score=score_data["values_score"],
-                        employment_score=score_data["employment_score"],
-                        financial_score=score_data["financial_score"],
-                        strengths=[],
-                        weaknesses=[],
-                        advice="",
-                        algorithm_version="1.0"
-                    )
-                    db.add(recommendation)
-
-                db.commit()
-
-                # Recharger les recommandations fraîchement générées
-                recommendations = db.query(Recommendation).filter(
-                    Recommendation.student_id == profile.id,
-                    Recommendation.total_score >= 50
-                ).order_by(Recommendation.total_score.desc()).all()
+            from app.utils.recommendation_store import build_rows, build_score_vector, replace_recommendations
+
+            # Même moteur et mêmes pondérations que POST /recommendations/generate
+            context = StudentContext.load(db, profile, riasec_test)
+            catalog = get_catalog_matrix(db)
+            scores = score_candidates(catalog, context)
+            entries = recommend_for_student(catalog, context, scores=scores)
+
+            if entries:
+                # Remplacer les anciennes recommandations (même celles < 50) en une transaction
+                fingerprint = input_fingerprint(catalog, context)
+                inserted = replace_recommendations(
+                    db,
+                    [profile.id],
+                    build_rows(profile.id, entries, input_fingerprint=fingerprint),
+                    score_vectors=[build_score_vector(profile.id, catalog, scores, fingerprint)]
+                )
+
+                # Garder les recommandations fraîchement générées (déjà triées)
+                recommendations = [rec for rec in inserted if rec.total_score >= 50]
 
                 import logging
                 logging.info(f"[PDF] Auto-generated {len(recommendations)} recommendations for student {profile.id}")
         except Exception as e:
+            db.rollback()
             import logging
             logging.warning(f"[PDF] Could not auto-generate recommendations: {e}")
 
     # Préparer les données des recommandations pour le PDF
+    # (programmes et Masters associés chargés en une seule requête)
+    from app.api.v1.endpoints.recommendations import load_programs_by_id
+    programs_by_id = load_programs_by_id(db, [rec.program_id for rec in recommendations])
+
     recommendations_data = []
     for rec in recommendations:
-        program = db.query(Program).filter(Program.id == rec.program_id).first()
+        program = programs_by_id.get(rec.program_id)
         if program:
             rec_data = {
                 'score': rec.total_score,
@@ -572,7 +546,7 @@ async def download_latest_result_pdf(
 
             # Si c'est une Licence avec un Master associé, récupérer les infos du Master
             if program.level == 'Licence' and program.master_program_id:
-                master = db.query(Program).filter(Program.id == program.master_program_id).first()
+                master = program.master_program
                 if master:
                     rec_data['master_program'] = {
                         'name': master.name,
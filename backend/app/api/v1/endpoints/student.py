@@ -2,7 +2,7 @@
 Student profile endpoints
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -22,6 +22,7 @@ from app.schemas.student import (
     ValuesCreate, ValuesUpdate, ValuesResponse
 )
 from app.schemas.auth import MessageResponse
+from app.utils.recommendation_jobs import schedule_recommendations
 
 router = APIRouter(prefix="/student", tags=["Student Profile"])
 
@@ -293,6 +294,7 @@ async def upload_avatar_base64(
 @router.put("/profile", response_model=StudentProfileResponse)
 async def update_profile(
     profile_data: StudentProfileUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -324,6 +326,9 @@ async def update_profile(
     db.commit()
     db.refresh(profile)
 
+    # Bac grade, budget and user type feed the recommendation scores
+    schedule_recommendations(background_tasks, profile.id)
+
     completion = profile.completion_percentage or 0
     try:
         completion = calculate_completion_percentage(profile, db)
@@ -402,6 +407,7 @@ async def get_grades(
 @router.post("/grades", response_model=GradeResponse, status_code=status.HTTP_201_CREATED)
 async def create_grade(
     grade_data: GradeCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -438,6 +444,8 @@ async def create_grade(
     db.commit()
     db.refresh(grade)
 
+    schedule_recommendations(background_tasks, profile.id)
+
     return _grade_to_response(grade)
 
 
@@ -445,6 +453,7 @@ async def create_grade(
 async def update_grade(
     grade_id: str,
     grade_data: GradeUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -485,12 +494,15 @@ async def update_grade(
     db.commit()
     db.refresh(grade)
 
+    schedule_recommendations(background_tasks, profile.id)
+
     return _grade_to_response(grade)
 
 
 @router.delete("/grades/{grade_id}", response_model=MessageResponse)
 async def delete_grade(
     grade_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -522,6 +534,8 @@ async def delete_grade(
     db.delete(grade)
     db.commit()
 
+    schedule_recommendations(background_tasks, profile.id)
+
     return MessageResponse(message="Grade deleted successfully")
 
 
@@ -563,6 +577,7 @@ async def get_values(
 @router.post("/values", response_model=ValuesResponse, status_code=status.HTTP_201_CREATED)
 async def create_values(
     values_data: ValuesCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -617,6 +632,8 @@ async def create_values(
     db.commit()
     db.refresh(values)
 
+    schedule_recommendations(background_tasks, profile.id)
+
     # Note: Profile completion percentage will be recalculated on next GET /profile
 
     return _values_to_response(values)
@@ -625,6 +642,7 @@ async def create_values(
 @router.put("/values", response_model=ValuesResponse)
 async def update_values(
     values_data: ValuesUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
@@ -664,6 +682,8 @@ async def update_values(
     db.commit()
     db.refresh(values)
 
+    schedule_recommendations(background_tasks, profile.id)
+
     # Note: Profile completion percentage will be recalculated on next GET /profile
 
     return _values_to_response(values)
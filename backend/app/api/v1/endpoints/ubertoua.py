@@ -1,18 +1,28 @@
 """
 UBertoua data endpoints
 """
+import json
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.data.ubertoua_data import (
+    UBERTOUA_DATA,
     get_establishments,
     get_departments,
     get_programs,
     get_ue_for_program
 )
+from app.utils.http_cache import make_etag, static_conditional_get
 
-router = APIRouter(prefix="/ubertoua", tags=["UBertoua Data"])
+# The data ships with the code: one ETag per content, for every route
+UBERTOUA_ETAG = make_etag(json.dumps(UBERTOUA_DATA, sort_keys=True))
+
+router = APIRouter(
+    prefix="/ubertoua",
+    tags=["UBertoua Data"],
+    dependencies=[Depends(static_conditional_get(UBERTOUA_ETAG))]
+)
 
 
 class EstablishmentResponse(BaseModel):
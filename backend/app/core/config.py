@@ -30,6 +30,9 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Scoring algorithm: "1.1" (Holland code positions) or "2.0" (RIASEC vectors)
+    SCORING_ALGORITHM_VERSION: str = "1.1"
+
     # Email (SMTP)
     SMTP_HOST: str = ""
     SMTP_PORT: int = 587
@@ -9,8 +9,9 @@ from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
 
-# Security scheme
+# Security schemes
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -97,11 +98,17 @@ async def get_current_active_user(
     return current_user
 
 
-async def get_optional_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+def load_optional_user(
+    db: Session,
+    credentials: Optional[HTTPAuthorizationCredentials]
 ) -> Optional[User]:
-    """Get current user if authenticated, otherwise None"""
+    """
+    User of an optional bearer token, or None
+
+    For endpoints that only need the user on some paths: they depend on
+    optional_security and call this where the user matters, so anonymous
+    and cached answers never touch the database.
+    """
 
     if credentials is None:
         return None
@@ -126,3 +133,12 @@ async def get_optional_current_user(
         return None
 
     return None
+
+
+async def get_optional_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """Get current user if authenticated, otherwise None"""
+
+    return load_optional_user(db, credentials)
@@ -0,0 +1,54 @@
+"""add_program_filter_indexes
+
+Revision ID: 2e670e21cc9d
+Revises: 0b2866739047
+Create Date: 2026-10-17 12:00:00.000000
+
+Indexes matched to the program listing access paths (PostgreSQL only):
+- active programs in listing order (department, name, id), partial
+- riasec_match prefix matches (LIKE 'IA%'), text_pattern_ops so that
+  the index works whatever the database collation
+- department substring matches (ILIKE '%info%'), pg_trgm GIN index
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e670e21cc9d'
+down_revision: Union[str, Sequence[str], None] = '0b2866739047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_programs_active_department_name', 'programs', ['department', 'name', 'id'],
+        postgresql_where=sa.text('is_active')
+    )
+    op.create_index(
+        'ix_programs_riasec_match_pattern', 'programs', ['riasec_match'],
+        postgresql_ops={'riasec_match': 'text_pattern_ops'}
+    )
+    op.create_index(
+        'ix_programs_department_trgm', 'programs', ['department'],
+        postgresql_using='gin',
+        postgresql_ops={'department': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_programs_department_trgm', table_name='programs')
+    op.drop_index('ix_programs_riasec_match_pattern', table_name='programs')
+    op.drop_index('ix_programs_active_department_name', table_name='programs')
@@ -153,6 +153,101 @@ async def create_tables():
     except Exception as e:
         print(f"[STARTUP] riasec_test_drafts migration warning: {e}", flush=True)
 
+    # Ensure recommendations.input_fingerprint column exists
+    try:
+        from sqlalchemy import text
+        with engine.connect() as conn:
+            result = conn.execute(text(
+                "SELECT EXISTS (SELECT FROM information_schema.columns "
+                "WHERE table_name = 'recommendations' AND column_name = 'input_fingerprint')"
+            ))
+            if not result.scalar():
+                print("[STARTUP] Adding recommendations.input_fingerprint column...", flush=True)
+                conn.execute(text("ALTER TABLE recommendations ADD COLUMN input_fingerprint VARCHAR(64)"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_recommendations_student_fingerprint "
+                    "ON recommendations (student_id, input_fingerprint)"
+                ))
+                conn.commit()
+                print("[STARTUP] input_fingerprint column added!", flush=True)
+    except Exception as e:
+        print(f"[STARTUP] input_fingerprint migration warning: {e}", flush=True)
+
+    # Ensure programs.riasec_profile column exists
+    try:
+        from sqlalchemy import text
+        with engine.connect() as conn:
+            result = conn.execute(text(
+                "SELECT EXISTS (SELECT FROM information_schema.columns "
+                "WHERE table_name = 'programs' AND column_name = 'riasec_profile')"
+            ))
+            if not result.scalar():
+                print("[STARTUP] Adding programs.riasec_profile column...", flush=True)
+                conn.execute(text("ALTER TABLE programs ADD COLUMN riasec_profile JSON"))
+                conn.commit()
+                print("[STARTUP] riasec_profile column added!", flush=True)
+    except Exception as e:
+        print(f"[STARTUP] riasec_profile migration warning: {e}", flush=True)
+
+    # Ensure the program filter indexes exist (alembic revision 2e670e21cc9d)
+    try:
+        from sqlalchemy import text
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                result = conn.execute(text(
+                    "SELECT EXISTS (SELECT FROM pg_indexes "
+                    "WHERE tablename = 'programs' AND indexname = 'ix_programs_department_trgm')"
+                ))
+                if not result.scalar():
+                    print("[STARTUP] Creating program filter indexes...", flush=True)
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_programs_active_department_name "
+                        "ON programs (department, name, id) WHERE is_active"
+                    ))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_programs_riasec_match_pattern "
+                        "ON programs (riasec_match text_pattern_ops)"
+                    ))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_programs_department_trgm "
+                        "ON programs USING gin (department gin_trgm_ops)"
+                    ))
+                    conn.commit()
+                    print("[STARTUP] Program filter indexes created!", flush=True)
+    except Exception as e:
+        print(f"[STARTUP] program indexes migration warning: {e}", flush=True)
+
+    # Build the scoring catalog (and its RIASEC lookup table) before the first request
+    try:
+        from app.core.database import SessionLocal
+        from app.utils.scoring import get_catalog_matrix
+
+        db = SessionLocal()
+        try:
+            catalog = get_catalog_matrix(db)
+            print(f"[STARTUP] Scoring catalog loaded: {catalog.size} programs, "
+                  f"{len(catalog.riasec_table.codes)} RIASEC codes", flush=True)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"[STARTUP] Scoring catalog warning: {e}", flush=True)
+
+    # Load the catalog snapshot served by the read-only program endpoints
+    try:
+        from app.core.database import SessionLocal
+        from app.utils.catalog_snapshot import get_catalog_snapshot
+
+        db = SessionLocal()
+        try:
+            snapshot = get_catalog_snapshot(db)
+            print(f"[STARTUP] Catalog snapshot loaded: {len(snapshot.items)} programs "
+                  f"({len(snapshot.active_ids)} active)", flush=True)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"[STARTUP] Catalog snapshot warning: {e}", flush=True)
+
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
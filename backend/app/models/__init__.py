@@ -7,7 +7,7 @@ from app.models.riasec_test import RiasecTest, RiasecDimension, RiasecQuestion
 from app.models.academic_grade import AcademicGrade
 from app.models.professional_value import ProfessionalValue
 from app.models.program import Program, ProgramSubject
-from app.models.recommendation import Recommendation
+from app.models.recommendation import Recommendation, RecommendationScoreVector
 from app.models.student_favorite import StudentFavorite
 from app.models.testimonial import Testimonial
 from app.models.notification import Notification
@@ -24,6 +24,7 @@ __all__ = [
     "Program",
     "ProgramSubject",
     "Recommendation",
+    "RecommendationScoreVector",
     "StudentFavorite",
     "Testimonial",
     "Notification",
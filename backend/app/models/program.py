@@ -32,6 +32,9 @@ class Program(Base):
 
     # RIASEC match
     riasec_match = Column(String(3), nullable=False)
+    # Curated 0-100 score per RIASEC letter, e.g. {"R": 80, "I": 60, ...}
+    # (vector scoring derives one from riasec_match when missing)
+    riasec_profile = Column(JSON, nullable=True)
 
     # Costs
     registration_fee = Column(Integer, nullable=False)
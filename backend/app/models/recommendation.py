@@ -3,7 +3,7 @@ Recommendation model
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, CheckConstraint, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, LargeBinary, CheckConstraint, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -32,13 +32,34 @@ class Recommendation(Base):
     advice = Column(Text)
 
     algorithm_version = Column(String(10), nullable=False, default="1.0")
+    # Hash of every scoring input (see app.utils.scoring.input_fingerprint)
+    input_fingerprint = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Constraints
     __table_args__ = (
         CheckConstraint("total_score >= 0 AND total_score <= 100", name="check_total_score"),
+        Index("ix_recommendations_student_fingerprint", "student_id", "input_fingerprint"),
     )
 
     # Relationships
     student = relationship("StudentProfile", back_populates="recommendations")
     program = relationship("Program", back_populates="recommendations")
+
+
+class RecommendationScoreVector(Base):
+    """Component scores of a student against every catalog program"""
+
+    __tablename__ = "recommendation_score_vectors"
+
+    student_id = Column(String(36), ForeignKey("student_profiles.id", ondelete="CASCADE"), primary_key=True)
+
+    # Same fingerprint as the recommendation set: it pins the catalog version,
+    # hence the program order of the packed scores
+    input_fingerprint = Column(String(64), nullable=False)
+    program_count = Column(Integer, nullable=False)
+    # uint8 matrix (components x programs), see app.utils.scoring.pack_scores
+    scores = Column(LargeBinary, nullable=False)
+
+    algorithm_version = Column(String(10), nullable=False, default="1.0")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
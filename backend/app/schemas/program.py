@@ -1,7 +1,7 @@
 """
 Program Pydantic schemas
 """
-from typing import Annotated, List, Optional
+from typing import Annotated, Dict, List, Optional
 from pydantic import BaseModel, Field, BeforeValidator
 
 # Convert UUID objects to strings automatically
@@ -51,11 +51,19 @@ class ProgramListItem(BaseModel):
     master_program_id: OptStrUUID = None
     master_program: Optional["MasterProgramBrief"] = None
 
+    # Set by GET /programs?sort=compatibility for a logged-in student
+    compatibility_score: Optional[int] = None
+
     class Config:
         from_attributes = True
         populate_by_name = True
 
 
+class SimilarProgram(ProgramListItem):
+    """Schema for a program similar to another one"""
+    similarity_score: int = Field(..., ge=0, le=100)
+
+
 class ProgramDetail(BaseModel):
     """Schema for detailed program view"""
     id: StrUUID
@@ -77,6 +85,7 @@ class ProgramDetail(BaseModel):
 
     # RIASEC match
     riasec_match: str
+    riasec_profile: Optional[Dict[str, int]] = None
 
     # Costs
     registration_fee: int
@@ -155,6 +164,24 @@ class ProgramCompatibility(BaseModel):
         from_attributes = True
 
 
+# Upper bound on program ids per batch compatibility request
+MAX_COMPATIBILITY_BATCH = 300
+
+
+class CompatibilityBatchRequest(BaseModel):
+    """Schema for batch compatibility request"""
+    program_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_COMPATIBILITY_BATCH,
+        description="Program UUIDs to score (duplicates are ignored)"
+    )
+
+
+class CompatibilityBatchResponse(BaseModel):
+    """Schema for batch compatibility result"""
+    results: List[ProgramCompatibility]
+    not_found: List[str] = []
+
+
 class ProgramStatistics(BaseModel):
     """Schema for program statistics"""
     total_programs: int
@@ -165,7 +192,23 @@ class ProgramStatistics(BaseModel):
     riasec_distribution: dict
 
 
+class BudgetFacet(BaseModel):
+    """Programs within one annual budget ceiling"""
+    max_budget: int
+    count: int
+
+
+class ProgramFacets(BaseModel):
+    """Schema for the filter facets of the program listing"""
+    total: int = Field(..., description="Programs matching every filter")
+    level: Dict[str, int]
+    domain: Dict[str, int]
+    department: Dict[str, int]
+    budget: List[BudgetFacet]
+
+
 class ProgramListResponse(BaseModel):
     """Schema for paginated program list response"""
     programs: List[ProgramListItem]
     total: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (default order), None on the last page")
@@ -4,6 +4,7 @@ Recommendation Pydantic schemas
 from typing import Annotated, List, Optional
 from pydantic import BaseModel, BeforeValidator, Field
 from app.schemas.program import ProgramListItem
+from app.schemas.student import ValuesUpdate
 
 # Convert UUID objects to strings automatically
 StrUUID = Annotated[str, BeforeValidator(lambda v: str(v) if v is not None else v)]
@@ -42,7 +43,9 @@ class RecommendationResponse(BaseModel):
 
 class RecommendationWithDetails(BaseModel):
     """Schema for recommendation with program details"""
-    id: StrUUID
+    id: Optional[StrUUID] = Field(
+        None, description="None for a program re-ranked under filters that is not in the stored set"
+    )
     student_profile_id: StrUUID
     program_id: StrUUID
     ranking: int
@@ -71,4 +74,32 @@ class RecommendationWithDetails(BaseModel):
 class GenerateRecommendationsRequest(BaseModel):
     """Schema for generating recommendations request"""
     force_regenerate: bool = Field(False, description="Force regeneration even if recent recommendations exist")
-    limit: Optional[int] = Field(10, ge=1, le=50, description="Maximum number of recommendations to generate")
+    limit: Optional[int] = Field(10, ge=1, le=50, description="Number of recommendations to return (the stored set keeps the top 20)")
+
+
+class RecommendationStatusResponse(BaseModel):
+    """Schema for the freshness of stored recommendations"""
+    status: str = Field(..., description="fresh, computing, stale or empty")
+    count: int = Field(..., ge=0, description="Number of stored recommendations")
+    computed_at: Optional[str] = Field(None, description="When the stored set was computed")
+
+
+class SimulateRecommendationsRequest(BaseModel):
+    """Schema for a what-if simulation: inputs to replace, None keeps the current value"""
+    holland_code: Optional[str] = Field(None, pattern="^[RIASEC]{1,3}$", description="RIASEC Holland Code (1-3 letters)")
+    bac_grade: Optional[int] = Field(None, ge=0, le=20)
+    bac_series: Optional[str] = Field(None, max_length=20)
+    max_annual_budget: Optional[int] = Field(None, ge=0)
+    user_type: Optional[str] = Field(None, pattern="^(new_bachelor|university_student)$")
+    values: Optional[ValuesUpdate] = Field(None, description="Professional values to replace")
+    limit: int = Field(10, ge=1, le=50, description="Number of programs to return")
+
+
+class SimulatedRecommendation(RecommendationScores):
+    """Schema for one program of a simulated ranking (nothing is stored)"""
+    ranking: int
+    program_id: StrUUID
+    strengths: List[str]
+    weaknesses: List[str]
+    advice: str
+    program: ProgramListItem
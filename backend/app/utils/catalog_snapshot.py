@@ -0,0 +1,366 @@
+"""
+In-memory snapshot of the program catalog for the read endpoints
+
+The catalog only changes when an admin script runs. Every program, its
+subjects and the API models derived from them are loaded once into an
+immutable snapshot; listing, facets, search and detail are then served
+from memory. The database is only touched to check the version stamp (at
+most every SNAPSHOT_CHECK_INTERVAL seconds) and to reload after a change.
+"""
+import base64
+import json
+import threading
+import time
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.program import Program, ProgramSubject
+from app.schemas.program import (
+    BudgetFacet,
+    MasterProgramBrief,
+    ProgramFacets,
+    ProgramDetail,
+    ProgramListItem,
+    ProgramSubjectResponse
+)
+from app.utils.scoring import catalog_version
+from app.utils.search_index import SearchIndex
+
+# Seconds between two version checks; changes show up at most this late
+SNAPSHOT_CHECK_INTERVAL = 5.0
+
+# Default page size of GET /programs/search
+SEARCH_LIMIT = 50
+
+# Filter combinations whose results are kept per snapshot
+FILTER_CACHE_SIZE = 256
+
+# Annual budget ceilings (FCFA) counted by the budget facet
+BUDGET_FACET_CEILINGS = (100000, 150000, 250000, 350000, 500000, 1000000)
+
+# Columns copied as is into the list and detail models
+_LIST_FIELDS = tuple(
+    name for name in ProgramListItem.model_fields if name not in ("master_program", "compatibility_score")
+)
+_DETAIL_FIELDS = tuple(
+    name for name in ProgramDetail.model_fields if name not in ("master_program", "subjects", "created_at", "updated_at")
+)
+
+
+def subjects_version(db: Session) -> Tuple:
+    """Cheap version stamp of the program subjects (no timestamps on that table)"""
+    row = db.query(
+        func.count(ProgramSubject.id),
+        func.sum(func.length(ProgramSubject.name))
+    ).one()
+    return tuple(row)
+
+
+def encode_cursor(sort_key: Tuple[str, str, str]) -> str:
+    """Opaque listing cursor from a (department, name, id) sort key"""
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, str]:
+    """Sort key of a listing cursor; raises ValueError when malformed"""
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not (isinstance(sort_key, list) and len(sort_key) == 3 and all(isinstance(v, str) for v in sort_key)):
+        raise ValueError("Invalid cursor")
+    return tuple(sort_key)
+
+
+def _union(bitmaps: Dict, predicate) -> int:
+    """Union of the bitmaps whose value satisfies ``predicate``"""
+    bits = 0
+    for value, bitmap in bitmaps.items():
+        if predicate(value):
+            bits |= bitmap
+    return bits
+
+
+def snapshot_version(db: Session) -> Tuple:
+    """Version stamp of everything the snapshot holds: programs and subjects"""
+    return (catalog_version(db), subjects_version(db))
+
+
+class CatalogSnapshot:
+    """
+    Immutable, pre-serialized view of the whole catalog
+
+    Holds every program (active or not) as ready-made list and detail
+    models, the active ids in the default listing order (department, name,
+    id) and in name order. Callers must not modify
+    the returned models: use ``model_copy`` to personalize one.
+    """
+
+    def __init__(
+        self,
+        programs: Sequence[Program],
+        subjects: Dict[str, List[ProgramSubject]],
+        name_order: Sequence[str],
+        version: Tuple = ()
+    ):
+        self.version = version
+        by_id = {p.id: p for p in programs}
+
+        masters: Dict[str, MasterProgramBrief] = {}
+        for p in programs:
+            master = by_id.get(p.master_program_id) if p.master_program_id else None
+            if master is not None:
+                masters[p.id] = MasterProgramBrief(
+                    id=master.id,
+                    code=master.code,
+                    name=master.name,
+                    duration_years=master.duration_years
+                )
+
+        self.items = MappingProxyType({
+            p.id: ProgramListItem(
+                **{name: getattr(p, name) for name in _LIST_FIELDS},
+                master_program=masters.get(p.id)
+            )
+            for p in programs
+        })
+        self.details = MappingProxyType({
+            p.id: ProgramDetail(
+                **{name: getattr(p, name) for name in _DETAIL_FIELDS},
+                master_program=masters.get(p.id),
+                subjects=[ProgramSubjectResponse.model_validate(s) for s in subjects.get(p.id, [])],
+                created_at=p.created_at.isoformat(),
+                updated_at=p.updated_at.isoformat()
+            )
+            for p in programs
+        })
+
+        active = [p for p in programs if p.is_active]
+        self.active_ids: Tuple[str, ...] = tuple(p.id for p in active)
+        self.name_order: Tuple[str, ...] = tuple(name_order)
+
+        # Keyset pagination: position in the default order and sort key
+        self.order_index = MappingProxyType({p.id: i for i, p in enumerate(active)})
+        self.sort_keys = MappingProxyType({p.id: (p.department or "", p.name or "", p.id) for p in active})
+        self._filter_cache: Dict[Tuple, Tuple[str, ...]] = {}
+
+        # Filter columns of the active programs, in default order
+        self._filter_rows = tuple(
+            (p.id, p.level, p.domain, (p.department or "").lower(), p.riasec_match or "", p.annual_tuition)
+            for p in active
+        )
+        # Facet bitmaps: bit i is the i-th active program in default order
+        self._facet_bits: Dict[str, Dict] = {
+            "level": {}, "domain": {}, "department": {}, "riasec": {}, "tuition": {}
+        }
+        for i, p in enumerate(active):
+            for facet, value in (
+                ("level", p.level),
+                ("domain", p.domain),
+                ("department", p.department or ""),
+                ("riasec", p.riasec_match or ""),
+                ("tuition", p.annual_tuition),
+            ):
+                bitmaps = self._facet_bits[facet]
+                bitmaps[value] = bitmaps.get(value, 0) | (1 << i)
+        self._all_bits = (1 << len(active)) - 1
+
+        # Full-text index of the active programs, documents in name order
+        # so that equally relevant programs come out alphabetically
+        self.search_index = SearchIndex([
+            {
+                "name": by_id[program_id].name,
+                "code": by_id[program_id].code,
+                "department": by_id[program_id].department,
+                "description": by_id[program_id].description,
+            }
+            for program_id in self.name_order
+        ])
+
+    def filter_ids(
+        self,
+        level: Optional[str] = None,
+        domain: Optional[str] = None,
+        department: Optional[str] = None,
+        riasec_code: Optional[str] = None,
+        max_budget: Optional[int] = None
+    ) -> Tuple[str, ...]:
+        """
+        Ids of the active programs matching the GET /programs filters, in
+        default order
+
+        Same semantics as the former SQL filters: exact level and domain,
+        case-insensitive department substring, RIASEC code prefix and
+        tuition ceiling. Results are cached per filter combination, so
+        every page of a listing costs the same.
+        """
+        key = (level, domain, department, riasec_code, max_budget)
+        cached = self._filter_cache.get(key)
+        if cached is not None:
+            return cached
+
+        department = department.lower() if department else None
+        program_ids = tuple(
+            program_id
+            for program_id, program_level, program_domain, program_department, riasec_match, tuition in self._filter_rows
+            if (not level or program_level == level)
+            and (not domain or program_domain == domain)
+            and (not department or department in program_department)
+            and (not riasec_code or riasec_match.startswith(riasec_code))
+            and (not max_budget or tuition <= max_budget)
+        )
+
+        if len(self._filter_cache) >= FILTER_CACHE_SIZE:
+            self._filter_cache.pop(next(iter(self._filter_cache)), None)
+        self._filter_cache[key] = program_ids
+        return program_ids
+
+    def _department_bits(self, department: str) -> int:
+        """Programs whose department contains ``department`` (case-insensitive)"""
+        department = department.lower()
+        return _union(self._facet_bits["department"], lambda value: department in value.lower())
+
+    def _budget_bits(self, max_budget: int) -> int:
+        """Programs whose annual tuition is at most ``max_budget``"""
+        return _union(self._facet_bits["tuition"], lambda value: value <= max_budget)
+
+    def _filter_masks(
+        self,
+        level: Optional[str],
+        domain: Optional[str],
+        department: Optional[str],
+        riasec_code: Optional[str],
+        max_budget: Optional[int]
+    ) -> Dict[str, int]:
+        """Bitmap of the programs passing each GET /programs filter"""
+        bits = self._facet_bits
+        return {
+            "level": bits["level"].get(level, 0) if level else self._all_bits,
+            "domain": bits["domain"].get(domain, 0) if domain else self._all_bits,
+            "department": self._department_bits(department) if department else self._all_bits,
+            "riasec": (
+                _union(bits["riasec"], lambda value: value.startswith(riasec_code))
+                if riasec_code else self._all_bits
+            ),
+            "tuition": self._budget_bits(max_budget) if max_budget else self._all_bits,
+        }
+
+    def facets(
+        self,
+        level: Optional[str] = None,
+        domain: Optional[str] = None,
+        department: Optional[str] = None,
+        riasec_code: Optional[str] = None,
+        max_budget: Optional[int] = None
+    ) -> ProgramFacets:
+        """
+        Number of active programs for every level, domain, department and
+        budget ceiling, given the GET /programs filters
+
+        Each facet is counted under every filter but its own, so a count is
+        the total the listing returns once that value is selected (zero
+        counts included). Counts are bitmap intersections: no program is
+        visited.
+        """
+        masks = self._filter_masks(level, domain, department, riasec_code, max_budget)
+
+        def others(facet: str) -> int:
+            bits = self._all_bits
+            for name, mask in masks.items():
+                if name != facet:
+                    bits &= mask
+            return bits
+
+        def counts(facet: str, value_mask) -> Dict[str, int]:
+            base = others(facet)
+            return {
+                value: (base & value_mask(value)).bit_count()
+                for value in sorted(v for v in self._facet_bits[facet] if v)
+            }
+
+        tuition_base = others("tuition")
+        return ProgramFacets(
+            total=others("").bit_count(),
+            level=counts("level", self._facet_bits["level"].__getitem__),
+            domain=counts("domain", self._facet_bits["domain"].__getitem__),
+            department=counts("department", self._department_bits),
+            budget=[
+                BudgetFacet(max_budget=ceiling, count=(tuition_base & self._budget_bits(ceiling)).bit_count())
+                for ceiling in BUDGET_FACET_CEILINGS
+            ]
+        )
+
+    def cursor_start(self, program_ids: Sequence[str], sort_key: Tuple[str, str, str]) -> int:
+        """
+        Index in ``program_ids`` (default order) of the first program after
+        the cursor's sort key: a binary search, whatever the page depth
+        """
+        position = self.order_index.get(sort_key[2])
+        if position is not None:
+            return bisect_right(program_ids, position, key=self.order_index.__getitem__)
+
+        # The cursor's program left the catalog since: compare sort keys
+        # (Python string order, close to the database collation)
+        return bisect_right(program_ids, tuple(sort_key), key=self.sort_keys.__getitem__)
+
+    def page(self, program_ids: Sequence[str], offset: int, limit: int) -> List[ProgramListItem]:
+        """List models of one page of ``program_ids``"""
+        return [self.items[program_id] for program_id in program_ids[offset:offset + limit]]
+
+    def search(self, q: str, offset: int = 0, limit: int = SEARCH_LIMIT) -> Tuple[List[ProgramListItem], int]:
+        """
+        Active programs matching every word of ``q``, most relevant first
+
+        Returns one page of list models and the total number of matches.
+        """
+        matches = self.search_index.search(q)
+        page = [self.items[self.name_order[position]] for position, _ in matches[offset:offset + limit]]
+        return page, len(matches)
+
+
+def load_catalog_snapshot(db: Session, version: Tuple = ()) -> CatalogSnapshot:
+    """Build a snapshot from the database (three queries)"""
+    programs = db.query(Program).order_by(Program.department, Program.name, Program.id).all()
+
+    subjects: Dict[str, List[ProgramSubject]] = {}
+    for subject in db.query(ProgramSubject).all():
+        subjects.setdefault(subject.program_id, []).append(subject)
+
+    name_order = [
+        program_id for (program_id,) in
+        db.query(Program.id).filter(Program.is_active == True).order_by(Program.name)
+    ]
+    return CatalogSnapshot(programs, subjects, name_order, version)
+
+
+_snapshot_lock = threading.Lock()
+_snapshot: Optional[CatalogSnapshot] = None
+_checked_at = 0.0
+
+
+def get_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    Get the current catalog snapshot
+
+    The version stamp is checked at most every SNAPSHOT_CHECK_INTERVAL
+    seconds; the snapshot is rebuilt when it changed.
+    """
+    global _snapshot, _checked_at
+
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < SNAPSHOT_CHECK_INTERVAL:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None and time.monotonic() - _checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return _snapshot
+
+        version = snapshot_version(db)
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_catalog_snapshot(db, version)
+        _checked_at = time.monotonic()
+        return _snapshot
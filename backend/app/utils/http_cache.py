@@ -0,0 +1,59 @@
+"""
+Conditional GET for the public read endpoints
+
+Responses that only change with the catalog (or never, for static data)
+carry a strong ETag derived from a version stamp and a Cache-Control
+header. A request whose If-None-Match holds the current ETag is answered
+304 Not Modified, with no body, before the response is built.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response, status
+
+from app.core.config import settings
+
+# Catalog data: reused for a few minutes, then revalidated (usually a 304)
+CATALOG_CACHE_CONTROL = "public, max-age=300"
+
+# Data shipped with the code: only changes with a deployment
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+
+def make_etag(*version) -> str:
+    """Strong ETag of a version stamp (and of the API version)"""
+    digest = hashlib.sha256(repr((settings.APP_VERSION,) + version).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def check_not_modified(
+    response: Response,
+    etag: str,
+    if_none_match: Optional[str],
+    cache_control: str = CATALOG_CACHE_CONTROL
+) -> None:
+    """
+    Set the ETag and Cache-Control headers of ``response``, or raise a 304
+    carrying them when the client's copy is current
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def static_conditional_get(etag: str, cache_control: str = STATIC_CACHE_CONTROL):
+    """Router dependency for endpoints whose data is fixed for the process (``etag``)"""
+    async def dependency(response: Response, if_none_match: Optional[str] = Header(None)) -> None:
+        check_not_modified(response, etag, if_none_match, cache_control)
+
+    return dependency
@@ -0,0 +1,62 @@
+"""
+Cached program statistics
+
+The counts and averages of GET /programs/statistics come from one
+GROUP BY query over the active catalog (level, department, RIASEC first
+letter) rolled up in Python over a few hundred groups. The result is kept
+until the catalog version stamp changes, checked at most every
+SNAPSHOT_CHECK_INTERVAL seconds: no program row is ever loaded.
+"""
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.program import Program
+from app.schemas.program import ProgramStatistics
+from app.utils.scoring import catalog_version
+from app.utils.versioned_cache import VersionedCache
+
+
+def compute_program_statistics(db: Session) -> ProgramStatistics:
+    """Counts by level, department and RIASEC first letter, averages (one query)"""
+    first_letter = func.substr(Program.riasec_match, 1, 1)
+    groups = db.query(
+        Program.level,
+        Program.department,
+        first_letter,
+        func.count(Program.id),
+        func.sum(Program.annual_tuition),
+        func.count(Program.employment_rate),
+        func.sum(Program.employment_rate)
+    ).filter(
+        Program.is_active == True
+    ).group_by(Program.level, Program.department, first_letter).all()
+
+    by_level: Dict[str, int] = {}
+    by_department: Dict[str, int] = {}
+    riasec_dist: Dict[str, int] = {}
+    total = tuition_sum = employment_count = employment_sum = 0
+
+    for level, department, letter, count, tuition, rated, employment in groups:
+        by_level[level] = by_level.get(level, 0) + count
+        by_department[department] = by_department.get(department, 0) + count
+        letter = letter or "Unknown"
+        riasec_dist[letter] = riasec_dist.get(letter, 0) + count
+
+        total += count
+        tuition_sum += tuition or 0
+        employment_count += rated
+        employment_sum += employment or 0
+
+    return ProgramStatistics(
+        total_programs=total,
+        by_level=by_level,
+        by_department=by_department,
+        average_tuition=tuition_sum / total if total else 0,
+        average_employment_rate=employment_sum / employment_count if employment_count else 0,
+        riasec_distribution=riasec_dist
+    )
+
+
+program_statistics_cache = VersionedCache(catalog_version, compute_program_statistics)
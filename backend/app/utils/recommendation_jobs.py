@@ -0,0 +1,148 @@
+"""
+Background precomputation of recommendations
+
+Submitting the RIASEC test or changing values or grades schedules a
+recomputation, so the set is usually ready before the student opens the
+recommendations page. Jobs run in-process after the response is sent
+(FastAPI BackgroundTasks) with their own database session.
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.recommendation import Recommendation
+from app.models.student_profile import StudentProfile
+from app.utils.recommendation_store import (
+    build_rows,
+    build_score_vector,
+    lock_students,
+    replace_recommendations
+)
+from app.utils.scoring import (
+    MAX_RECOMMENDATIONS,
+    StudentContext,
+    get_catalog_matrix,
+    input_fingerprint,
+    recommend_for_student,
+    score_candidates
+)
+
+# Freshness of a student's stored recommendations
+STATUS_FRESH = "fresh"          # computed from the current inputs
+STATUS_COMPUTING = "computing"  # a recomputation is running
+STATUS_STALE = "stale"          # inputs changed since the set was computed
+STATUS_EMPTY = "empty"          # nothing stored and nothing scheduled
+
+logger = logging.getLogger(__name__)
+
+# Running jobs per student id (counted from the job itself: a task dropped
+# because its request failed never leaves a student "computing")
+_pending: Dict[str, int] = {}
+_pending_lock = threading.Lock()
+
+
+def is_computing(student_id: str) -> bool:
+    """True while a recomputation is running for this student"""
+    with _pending_lock:
+        return _pending.get(student_id, 0) > 0
+
+
+def schedule_recommendations(background_tasks: BackgroundTasks, student_id: str) -> None:
+    """Recompute the student's recommendations once the response is sent"""
+    background_tasks.add_task(recompute_recommendations, student_id)
+
+
+def recompute_recommendations(student_id: str) -> bool:
+    """
+    Recompute and store the top MAX_RECOMMENDATIONS of one student
+
+    Does nothing when the RIASEC test or the values are missing, or when the
+    stored set was already computed from the current inputs.
+    Returns True when a new set was written.
+    """
+    with _pending_lock:
+        _pending[student_id] = _pending.get(student_id, 0) + 1
+
+    db = SessionLocal()
+    try:
+        profile = db.query(StudentProfile).filter(StudentProfile.id == student_id).first()
+        if not profile:
+            return False
+
+        context = StudentContext.load(db, profile)
+        if not context.holland_code or not context.values:
+            return False
+
+        catalog = get_catalog_matrix(db)
+        fingerprint = input_fingerprint(catalog, context)
+        stored = latest_recommendation(db, student_id)
+        if stored is not None and stored.input_fingerprint == fingerprint:
+            return False
+
+        scores = score_candidates(catalog, context)
+        entries = recommend_for_student(catalog, context, MAX_RECOMMENDATIONS, scores=scores)
+
+        # POST /generate may have written the same set meanwhile
+        lock_students(db, [student_id])
+        stored = latest_recommendation(db, student_id)
+        if stored is not None and stored.input_fingerprint == fingerprint:
+            db.rollback()
+            return False
+
+        replace_recommendations(
+            db,
+            [student_id],
+            build_rows(student_id, entries, input_fingerprint=fingerprint),
+            score_vectors=[build_score_vector(student_id, catalog, scores, fingerprint)]
+        )
+        return True
+    except Exception as e:
+        # Never let a background job break anything: GET and /generate still work
+        logger.error(f"Background recomputation failed for {student_id}: {e}", exc_info=True)
+        db.rollback()
+        return False
+    finally:
+        db.close()
+        with _pending_lock:
+            remaining = _pending.get(student_id, 0) - 1
+            if remaining > 0:
+                _pending[student_id] = remaining
+            else:
+                _pending.pop(student_id, None)
+
+
+def latest_recommendation(db: Session, student_id: str) -> Optional[Recommendation]:
+    """Top-ranked stored recommendation (carries the set's fingerprint), or None"""
+    return db.query(Recommendation).filter(
+        Recommendation.student_id == student_id
+    ).order_by(Recommendation.ranking).first()
+
+
+def recommendation_status(db: Session, profile: StudentProfile, stored: Optional[Recommendation] = None) -> str:
+    """
+    Freshness of the student's stored recommendations
+
+    Loads the scoring context to rebuild the input fingerprint (about 4
+    queries): only GET /recommendations/status pays for it.
+
+    - **stored**: any recommendation of the stored set when the caller
+      already loaded it (avoids a query)
+    """
+    if is_computing(profile.id):
+        return STATUS_COMPUTING
+
+    if stored is None:
+        stored = latest_recommendation(db, profile.id)
+        if stored is None:
+            return STATUS_EMPTY
+
+    context = StudentContext.load(db, profile)
+    if not context.holland_code or not context.values:
+        return STATUS_STALE
+
+    current = input_fingerprint(get_catalog_matrix(db), context)
+    return STATUS_FRESH if stored.input_fingerprint == current else STATUS_STALE
@@ -0,0 +1,176 @@
+"""
+Bulk persistence of recommendation sets
+
+A student's recommendations are always replaced as a whole: one DELETE and
+one multi-row INSERT ... RETURNING inside a single transaction, together
+with the packed whole-catalog score vector when one is given. Writers of
+the same student (background job, POST /recommendations/generate) are
+serialized by a row lock on the student profile.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.recommendation import Recommendation, RecommendationScoreVector
+from app.models.student_profile import StudentProfile
+from app.utils.scoring import ALGORITHM_VERSION, CatalogMatrix, pack_scores
+
+
+RECOMMENDATION_COLUMNS = (
+    Recommendation.id,
+    Recommendation.student_id,
+    Recommendation.program_id,
+    Recommendation.ranking,
+    Recommendation.total_score,
+    Recommendation.riasec_score,
+    Recommendation.grades_score,
+    Recommendation.values_score,
+    Recommendation.employment_score,
+    Recommendation.financial_score,
+    Recommendation.strengths,
+    Recommendation.weaknesses,
+    Recommendation.advice,
+    Recommendation.algorithm_version,
+    Recommendation.input_fingerprint,
+    Recommendation.created_at,
+)
+
+
+def build_rows(
+    student_id: str,
+    entries: Sequence[Dict],
+    algorithm_version: str = ALGORITHM_VERSION,
+    input_fingerprint: Optional[str] = None
+) -> List[Dict]:
+    """
+    Turn ranked score entries into Recommendation insert parameters
+
+    Each entry needs program_id, the five component scores, total_score,
+    strengths, weaknesses and advice. Ranking follows the entry order.
+    """
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "student_id": student_id,
+            "ranking": ranking,
+            "algorithm_version": algorithm_version,
+            "input_fingerprint": input_fingerprint,
+            "created_at": now,
+            **entry,
+        }
+        for ranking, entry in enumerate(entries, start=1)
+    ]
+
+
+def build_score_vector(
+    student_id: str,
+    catalog: CatalogMatrix,
+    scores: Dict,
+    input_fingerprint: str,
+    algorithm_version: str = ALGORITHM_VERSION
+) -> Dict:
+    """
+    Turn whole-catalog scores into RecommendationScoreVector insert parameters
+
+    - **scores**: score_catalog output over every catalog row
+    """
+    return {
+        "student_id": student_id,
+        "input_fingerprint": input_fingerprint,
+        "program_count": catalog.size,
+        "scores": pack_scores(scores),
+        "algorithm_version": algorithm_version,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def lock_students(db: Session, student_ids: Sequence[str]) -> None:
+    """
+    Lock the profiles of ``student_ids`` until the end of the transaction
+
+    SELECT ... FOR UPDATE in id order (no deadlock between batches); a
+    concurrent writer of the same student waits, then sees the committed
+    set. SQLite has no row locks but only ever runs one writer.
+    """
+    db.query(StudentProfile.id).filter(
+        StudentProfile.id.in_(list(student_ids))
+    ).order_by(StudentProfile.id).with_for_update().all()
+
+
+def upsert_score_vectors(db: Session, score_vectors: List[Dict]) -> None:
+    """Insert score vectors, replacing the stored vector of the same student"""
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        db.execute(
+            delete(RecommendationScoreVector).where(
+                RecommendationScoreVector.student_id.in_([v["student_id"] for v in score_vectors])
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        db.execute(insert(RecommendationScoreVector), score_vectors)
+        return
+
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(RecommendationScoreVector)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RecommendationScoreVector.student_id],
+        set_={
+            name: statement.excluded[name]
+            for name in ("input_fingerprint", "program_count", "scores", "algorithm_version", "created_at")
+        }
+    )
+    db.execute(statement, score_vectors)
+
+
+def replace_recommendations(
+    db: Session,
+    student_ids: Sequence[str],
+    rows: List[Dict],
+    commit: bool = True,
+    score_vectors: Optional[List[Dict]] = None
+) -> List:
+    """
+    Atomically replace the recommendations of ``student_ids`` with ``rows``
+
+    - **score_vectors**: build_score_vector results; when given, the stored
+      score vectors of ``student_ids`` are replaced in the same transaction
+
+    Takes the students' locks (see lock_students) if the caller did not.
+    Returns the inserted rows (in parameter order) as read back by RETURNING,
+    so callers can build responses without refreshing or re-querying.
+    """
+    lock_students(db, student_ids)
+
+    db.execute(
+        delete(Recommendation).where(Recommendation.student_id.in_(list(student_ids))),
+        execution_options={"synchronize_session": False}
+    )
+
+    if score_vectors is not None:
+        covered = {vector["student_id"] for vector in score_vectors}
+        uncovered = [student_id for student_id in student_ids if student_id not in covered]
+        if uncovered:
+            db.execute(
+                delete(RecommendationScoreVector).where(RecommendationScoreVector.student_id.in_(uncovered)),
+                execution_options={"synchronize_session": False}
+            )
+        if score_vectors:
+            upsert_score_vectors(db, score_vectors)
+
+    inserted = []
+    if rows:
+        result = db.execute(
+            insert(Recommendation).returning(*RECOMMENDATION_COLUMNS, sort_by_parameter_order=True),
+            rows
+        )
+        inserted = result.all()
+
+    if commit:
+        db.commit()
+
+    return inserted
@@ -0,0 +1,1111 @@
+"""
+Vectorized scoring engine shared by every scoring path
+
+The active catalog is loaded once into a column-oriented NumPy matrix and
+every program is scored for a student in a few array operations. Recommendation
+generation, the PDF report and the single-program compatibility check all go
+through ``score_catalog``; they only differ by their ``WeightProfile``.
+
+Two RIASEC matching modes exist, selected by the algorithm version: 1.x
+compares Holland code letters by position, 2.0 correlates the six test
+dimensions with a six-dimension profile of every program (one
+matrix-vector product for the whole catalog).
+"""
+import hashlib
+import itertools
+import json
+import threading
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.academic_grade import AcademicGrade
+from app.models.professional_value import ProfessionalValue
+from app.models.program import Program
+from app.models.riasec_test import RiasecTest
+from app.models.student_profile import StudentProfile
+
+
+# RIASEC letter -> professional values weights (simplified heuristic)
+RIASEC_VALUES_MAP = {
+    "R": {"autonomy": 0.3, "job_security": 0.3, "salary": 0.2, "variety": 0.2},
+    "I": {"autonomy": 0.4, "creativity": 0.3, "prestige": 0.2, "variety": 0.1},
+    "A": {"creativity": 0.5, "autonomy": 0.3, "variety": 0.2},
+    "S": {"helping_others": 0.5, "work_life_balance": 0.3, "job_security": 0.2},
+    "E": {"prestige": 0.4, "salary": 0.3, "autonomy": 0.2, "variety": 0.1},
+    "C": {"job_security": 0.4, "work_life_balance": 0.3, "salary": 0.2, "prestige": 0.1}
+}
+
+# Bump when weights or thresholds change: stored recommendation sets are then recomputed
+# 1.1: programs a new bachelor cannot enter (bac series, minimum grade) are pruned
+# 2.0: RIASEC fit from the six test dimensions against program RIASEC profiles
+POSITIONAL_ALGORITHM_VERSION = "1.1"
+VECTOR_ALGORITHM_VERSION = "2.0"
+ALGORITHM_VERSIONS = (POSITIONAL_ALGORITHM_VERSION, VECTOR_ALGORITHM_VERSION)
+
+# Version used by every scoring path (SCORING_ALGORITHM_VERSION setting)
+ALGORITHM_VERSION = settings.SCORING_ALGORITHM_VERSION
+if ALGORITHM_VERSION not in ALGORITHM_VERSIONS:
+    raise ValueError(
+        f"Unknown SCORING_ALGORITHM_VERSION {ALGORITHM_VERSION!r}, expected one of {', '.join(ALGORITHM_VERSIONS)}"
+    )
+
+RIASEC_LETTERS = "RIASEC"
+_UNKNOWN_LETTER = len(RIASEC_LETTERS)
+
+# RiasecTest dimension columns, in RIASEC_LETTERS order
+RIASEC_SCORE_FIELDS = (
+    "realistic_score", "investigative_score", "artistic_score",
+    "social_score", "enterprising_score", "conventional_score"
+)
+
+# Letter weights by position when a profile is derived from a Holland code
+HOLLAND_POSITION_WEIGHTS = (3.0, 2.0, 1.0)
+
+# Every Holland code get_holland_code can produce (6 x 5 x 4 = 120)
+HOLLAND_CODES = ["".join(p) for p in itertools.permutations(RIASEC_LETTERS, 3)]
+HOLLAND_CODE_INDEX = {code: i for i, code in enumerate(HOLLAND_CODES)}
+
+
+def calculate_riasec_compatibility(student_code: str, program_code: str) -> int:
+    """
+    Calculate RIASEC compatibility between student and program
+
+    Returns score 0-100 based on matching positions
+    """
+    if not student_code or not program_code:
+        return 0
+
+    score = 0
+
+    # Exact match on first position: 60 points
+    if len(student_code) > 0 and len(program_code) > 0:
+        if student_code[0] == program_code[0]:
+            score += 60
+
+    # Match on second position: 30 points
+    if len(student_code) > 1 and len(program_code) > 1:
+        if student_code[1] == program_code[1]:
+            score += 30
+        elif student_code[0] == program_code[1]:
+            score += 20  # First in student matches second in program
+
+    # Match on third position: 10 points
+    if len(student_code) > 2 and len(program_code) > 2:
+        if student_code[2] == program_code[2]:
+            score += 10
+        elif student_code[1] == program_code[2]:
+            score += 5
+
+    return min(score, 100)
+
+
+def holland_code_vector(code: Optional[str]) -> np.ndarray:
+    """Six-dimension RIASEC profile of a Holland code, first letters weighing more"""
+    vector = np.zeros(len(RIASEC_LETTERS), dtype=np.float64)
+    for position, letter in enumerate((code or "")[:len(HOLLAND_POSITION_WEIGHTS)]):
+        index = RIASEC_LETTERS.find(letter)
+        if index >= 0:
+            vector[index] += HOLLAND_POSITION_WEIGHTS[position]
+    return vector
+
+
+def program_riasec_vector(riasec_profile: Optional[Dict], riasec_match: Optional[str]) -> np.ndarray:
+    """Curated RIASEC profile of a program, or one derived from its Holland code"""
+    if riasec_profile:
+        vector = np.array([float(riasec_profile.get(letter) or 0) for letter in RIASEC_LETTERS])
+        if vector.any():
+            return vector
+    return holland_code_vector(riasec_match)
+
+
+def centered_unit_vectors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Center each row on its mean and scale it to unit length
+
+    Dot products of such rows are Pearson correlations (-1 to 1). Flat rows
+    (no preference) become zero and correlate 0 with everything.
+    """
+    centered = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 1e-9)
+
+
+def values_score_for_letter(values, letter: str) -> int:
+    """
+    Score 0-100 of a student's professional values against one RIASEC letter
+
+    Returns 50 when there are no values or the letter has no mapping
+    """
+    if not values:
+        return 50
+
+    value_weights = RIASEC_VALUES_MAP.get(letter, {})
+
+    total_score = 0
+    total_weight = 0
+
+    for value_name, weight in value_weights.items():
+        student_value = getattr(values, value_name, 3)  # Default 3/5
+        # Normalize to 0-100
+        normalized = (student_value - 1) / 4 * 100  # 1-5 scale to 0-100
+        total_score += normalized * weight
+        total_weight += weight
+
+    return int(total_score / total_weight) if total_weight > 0 else 50
+
+
+# Lightweight, picklable stand-ins for AcademicGrade / ProfessionalValue rows
+Grade = namedtuple("Grade", ["subject", "grade"])
+
+VALUE_FIELDS = (
+    "autonomy", "creativity", "helping_others", "job_security",
+    "salary", "work_life_balance", "prestige", "variety"
+)
+
+
+class StudentContext:
+    """
+    Everything needed to score one student, loaded once per request
+
+    Holds the latest Holland code, profile fields, all academic grades and
+    the professional values row so that scoring never goes back to the
+    database.
+    """
+
+    def __init__(
+        self,
+        student_id: Optional[str],
+        holland_code: Optional[str],
+        bac_grade: Optional[int],
+        max_annual_budget: Optional[int],
+        user_type: Optional[str],
+        grades: Sequence,
+        values,
+        profile: Optional[StudentProfile] = None,
+        bac_series: Optional[str] = None,
+        riasec_scores: Optional[Sequence[int]] = None
+    ):
+        self.student_id = student_id
+        self.holland_code = holland_code
+        # Six RIASEC dimension scores of the test (vector matching)
+        self.riasec_scores = tuple(riasec_scores) if riasec_scores is not None else None
+        self.bac_grade = bac_grade
+        self.bac_series = bac_series
+        self.max_annual_budget = max_annual_budget
+        self.user_type = user_type
+        self.grades = list(grades)
+        self.values = values
+        self.profile = profile
+
+    @classmethod
+    def from_profile(
+        cls,
+        profile: StudentProfile,
+        holland_code: Optional[str],
+        grades: Sequence,
+        values: Optional[ProfessionalValue],
+        riasec_scores: Optional[Sequence[int]] = None
+    ) -> "StudentContext":
+        """Build a context from an already loaded profile and its rows"""
+        return cls(
+            profile.id, holland_code, profile.bac_grade, profile.max_annual_budget,
+            profile.user_type, grades, values, profile, bac_series=profile.bac_series,
+            riasec_scores=riasec_scores
+        )
+
+    @classmethod
+    def load(cls, db: Session, profile: StudentProfile, riasec_test: Optional[RiasecTest] = None) -> "StudentContext":
+        """
+        Load the scoring context for a profile (3 queries at most)
+
+        - **riasec_test**: already loaded test, otherwise the latest one is fetched
+        """
+        if riasec_test is None:
+            riasec_test = db.query(RiasecTest).filter(
+                RiasecTest.student_id == profile.id
+            ).order_by(RiasecTest.created_at.desc()).first()
+
+        grades = db.query(AcademicGrade).filter(
+            AcademicGrade.student_id == profile.id
+        ).all()
+
+        values = db.query(ProfessionalValue).filter(
+            ProfessionalValue.student_id == profile.id
+        ).first()
+
+        if riasec_test is None:
+            return cls.from_profile(profile, None, grades, values)
+
+        return cls.from_profile(
+            profile, riasec_test.holland_code, grades, values,
+            riasec_scores=[getattr(riasec_test, name) for name in RIASEC_SCORE_FIELDS]
+        )
+
+    @classmethod
+    def load_many(cls, db: Session, profiles: Sequence[StudentProfile]) -> List["StudentContext"]:
+        """
+        Load contexts for many profiles with one query per table
+
+        Used by batch jobs: 3 queries whatever the number of profiles.
+        """
+        student_ids = [p.id for p in profiles]
+        if not student_ids:
+            return []
+
+        # Latest Holland code and dimension scores per student
+        holland_codes: Dict[str, str] = {}
+        riasec_scores: Dict[str, Tuple] = {}
+        tests = db.query(
+            RiasecTest.student_id,
+            RiasecTest.holland_code,
+            *[getattr(RiasecTest, name) for name in RIASEC_SCORE_FIELDS]
+        ).filter(
+            RiasecTest.student_id.in_(student_ids)
+        ).order_by(RiasecTest.created_at).all()
+        for student_id, holland_code, *scores in tests:
+            holland_codes[student_id] = holland_code
+            riasec_scores[student_id] = tuple(scores)
+
+        grades: Dict[str, List] = {}
+        for grade in db.query(AcademicGrade).filter(AcademicGrade.student_id.in_(student_ids)).all():
+            grades.setdefault(grade.student_id, []).append(grade)
+
+        values = {
+            v.student_id: v
+            for v in db.query(ProfessionalValue).filter(ProfessionalValue.student_id.in_(student_ids)).all()
+        }
+
+        return [
+            cls.from_profile(
+                p, holland_codes.get(p.id), grades.get(p.id, []), values.get(p.id),
+                riasec_scores=riasec_scores.get(p.id)
+            )
+            for p in profiles
+        ]
+
+    def detached(self) -> "StudentContext":
+        """Copy without ORM objects, cheap to pickle to worker processes"""
+        values = None
+        if self.values is not None:
+            values = SimpleNamespace(**{name: getattr(self.values, name) for name in VALUE_FIELDS})
+
+        return StudentContext(
+            self.student_id, self.holland_code, self.bac_grade, self.max_annual_budget,
+            self.user_type, [Grade(g.subject, g.grade) for g in self.grades], values,
+            bac_series=self.bac_series, riasec_scores=self.riasec_scores
+        )
+
+    def with_overrides(self, values: Optional[Dict[str, int]] = None, **fields) -> "StudentContext":
+        """
+        Detached copy with some inputs replaced, for what-if scoring
+
+        - **values**: professional values to replace, by field name
+        - **fields**: holland_code, bac_grade, bac_series, max_annual_budget
+          or user_type; None keeps the current value
+
+        The loaded profile and values rows are never modified.
+        """
+        context = self.detached()
+        for name, value in fields.items():
+            if name not in ("holland_code", "bac_grade", "bac_series", "max_annual_budget", "user_type"):
+                raise ValueError(f"Unknown scoring input: {name}")
+            if value is not None:
+                setattr(context, name, value)
+
+        # The test's dimension scores no longer describe an overridden code
+        if fields.get("holland_code") is not None:
+            context.riasec_scores = None
+
+        values = {name: value for name, value in (values or {}).items() if value is not None}
+        if values:
+            current = vars(context.values) if context.values is not None else {}
+            missing = [name for name in VALUE_FIELDS if name not in values and name not in current]
+            if missing:
+                raise ValueError(f"Missing professional values: {', '.join(missing)}")
+            context.values = SimpleNamespace(**{**current, **values})
+
+        return context
+
+    def grades_in(self, subjects: Iterable[str]) -> List:
+        """Grades whose subject is one of ``subjects``"""
+        wanted = set(subjects)
+        return [g for g in self.grades if g.subject in wanted]
+
+
+def _letter_index(letter: str) -> int:
+    """Index of a RIASEC letter, or _UNKNOWN_LETTER"""
+    index = RIASEC_LETTERS.find(letter)
+    return index if index >= 0 else _UNKNOWN_LETTER
+
+
+class RiasecTable:
+    """
+    Precomputed RIASEC compatibility for every (student code, program code)
+
+    Rows are the 120 Holland codes, columns the distinct ``riasec_match``
+    values of the catalog, so scoring a student is a single row lookup.
+    """
+
+    def __init__(self, program_codes: Iterable[str]):
+        self.codes: List[str] = sorted(set(program_codes))
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.table = np.array(
+            [[calculate_riasec_compatibility(student, code) for code in self.codes] for student in HOLLAND_CODES],
+            dtype=np.int16
+        ).reshape(len(HOLLAND_CODES), len(self.codes))
+
+    def row(self, student_code: Optional[str]) -> np.ndarray:
+        """Scores of one student code against every program code"""
+        i = HOLLAND_CODE_INDEX.get(student_code)
+        if i is not None:
+            return self.table[i]
+
+        # Partial or unusual codes fall back to direct computation
+        return np.array(
+            [calculate_riasec_compatibility(student_code, code) for code in self.codes],
+            dtype=np.int16
+        )
+
+
+# Bac series labels -> catalog series codes. Keys are upper-cased with
+# single spaces; a label missing from the table is its own code, which is
+# how the catalog spellings ("C", "BT", "GCE A/Level") are matched.
+BAC_SERIES_ALIASES = {
+    # Profile form choices (BAC_SERIES in frontend/lib/api/student.ts)
+    "A (LITTÉRAIRE)": "A",
+    "C (MATH-PHYSIQUE)": "C",
+    "D (MATH-SCIENCES)": "D",
+    "E (MATH-TECHNIQUE)": "E",
+    "F (TECHNIQUE)": "F",
+    "G (COMMERCIAL)": "G",
+    "TI (TECHNIQUE INDUSTRIEL)": "TI",
+    # Other spellings of the catalog series
+    "LITTÉRAIRE": "LITTERAIRE",
+    "GCE A LEVEL": "GCE A/LEVEL",
+    "GCE A-LEVEL": "GCE A/LEVEL",
+    **{
+        f"{prefix} {code}": code
+        for prefix in ("SERIE", "SÉRIE")
+        for code in ("A", "B", "C", "D", "E", "F", "G", "BT", "TI")
+    },
+}
+
+
+def normalize_bac_series(series: Optional[str]) -> Optional[str]:
+    """
+    Series code of a bac label: "C (Math-Physique)" and "Série c" give "C"
+
+    Returns None for empty values.
+    """
+    if not series:
+        return None
+    label = " ".join(series.upper().split())
+    return BAC_SERIES_ALIASES.get(label, label) or None
+
+
+class EligibilityIndex:
+    """
+    Entry prerequisites of the catalog, indexed for fast pruning
+
+    - one boolean bitmap of programs per bac series, plus the programs open
+      to every series (no required series)
+    - program rows sorted by minimum bac grade, so the programs a grade
+      qualifies for are a prefix found by binary search
+
+    Missing student data never excludes a program, and neither does a bac
+    series no catalog program lists (see series_code).
+    """
+
+    def __init__(self, rows: Sequence, min_bac_grade: np.ndarray):
+        self.size = len(rows)
+
+        required = [
+            {code for code in map(normalize_bac_series, r.required_bac_series or []) if code}
+            for r in rows
+        ]
+        self.open_to_all = np.array([not codes for codes in required], dtype=bool)
+        self.by_series: Dict[str, np.ndarray] = {}
+        for i, codes in enumerate(required):
+            for code in codes:
+                self.by_series.setdefault(code, np.zeros(self.size, dtype=bool))[i] = True
+
+        self.grade_order = np.argsort(min_bac_grade, kind="stable")
+        self.sorted_min_grade = min_bac_grade[self.grade_order]
+
+    def series_code(self, bac_series: Optional[str]) -> Optional[str]:
+        """
+        Catalog series code of a student's bac series
+
+        None when the series is missing or is not listed by any program (e.g.
+        "G (Commercial)"): prerequisites cannot be checked and nothing is pruned.
+        """
+        code = normalize_bac_series(bac_series)
+        return code if code in self.by_series else None
+
+    def mask(self, bac_series: Optional[str], bac_grade: Optional[int]) -> np.ndarray:
+        """Boolean mask of the programs a student can enter"""
+        eligible = np.ones(self.size, dtype=bool)
+
+        code = self.series_code(bac_series)
+        if code:
+            eligible &= self.open_to_all | self.by_series[code]
+
+        if bac_grade:
+            # min_bac_grade <= bac_grade (0 means no minimum)
+            qualified = np.zeros(self.size, dtype=bool)
+            qualified[self.grade_order[:np.searchsorted(self.sorted_min_grade, bac_grade, side="right")]] = True
+            eligible &= qualified
+
+        return eligible
+
+
+class CatalogMatrix:
+    """
+    Column-oriented view of the active program catalog
+
+    Each attribute is an array aligned on ``ids`` so that a student can be
+    scored against the whole catalog without touching ORM objects.
+    """
+
+    def __init__(self, rows: Sequence, version: Tuple = ()):
+        self.version = version
+        self.size = len(rows)
+
+        self.ids: List[str] = [r.id for r in rows]
+        self.row_index: Dict[str, int] = {program_id: i for i, program_id in enumerate(self.ids)}
+        self.levels = np.array([r.level for r in rows], dtype=object)
+        self.domains = np.array([r.domain for r in rows], dtype=object)
+
+        # Prerequisites (0 = no minimum, same as a falsy min_bac_grade)
+        self.min_bac_grade = np.array([r.min_bac_grade or 0 for r in rows], dtype=np.float64)
+        self.has_min_bac_grade = self.min_bac_grade != 0
+        self.eligibility = EligibilityIndex(rows, self.min_bac_grade)
+
+        # Holland codes as columns of the RIASEC lookup table
+        self.riasec_table = RiasecTable(r.riasec_match or "" for r in rows)
+        self.riasec_code_ids = np.array(
+            [self.riasec_table.index[r.riasec_match or ""] for r in rows],
+            dtype=np.int32
+        )
+
+        # Six-dimension RIASEC profiles (curated or derived from the code),
+        # centered and unit-length for vector matching
+        self.riasec_vectors = centered_unit_vectors(np.array(
+            [program_riasec_vector(r.riasec_profile, r.riasec_match) for r in rows],
+            dtype=np.float64
+        ).reshape(self.size, len(RIASEC_LETTERS)))
+
+        # Primary letter used for values alignment (defaults to "R")
+        self.primary_letter = np.array(
+            [_letter_index((r.riasec_match or "R")[0]) for r in rows],
+            dtype=np.int8
+        )
+
+        # Employment and costs
+        self.employment_score = np.array(
+            [int(r.employment_rate) if r.employment_rate else 50 for r in rows],
+            dtype=np.float64
+        )
+        self.annual_tuition = np.array([r.annual_tuition or 0 for r in rows], dtype=np.float64)
+        self.has_tuition = self.annual_tuition != 0
+
+        # Required subjects as a (programs x subjects) membership matrix
+        self.subject_index: Dict[str, int] = {}
+        for r in rows:
+            for subject in r.required_subjects or []:
+                self.subject_index.setdefault(subject, len(self.subject_index))
+
+        self.subject_matrix = np.zeros((self.size, len(self.subject_index)), dtype=np.float64)
+        for i, r in enumerate(rows):
+            for subject in r.required_subjects or []:
+                self.subject_matrix[i, self.subject_index[subject]] = 1.0
+        self.has_required_subjects = self.subject_matrix.any(axis=1) if self.size else np.zeros(0, dtype=bool)
+
+    def level_mask(self, levels: Iterable[str]) -> np.ndarray:
+        """Boolean mask of programs whose level is in ``levels``"""
+        return np.isin(self.levels, list(levels))
+
+
+def catalog_version(db: Session) -> Tuple:
+    """
+    Cheap version stamp of the program catalog
+
+    Changes whenever a program is added, removed, (de)activated or updated.
+    """
+    row = db.query(
+        func.count(Program.id),
+        func.sum(case((Program.is_active == True, 1), else_=0)),
+        func.max(Program.updated_at)
+    ).one()
+    return tuple(row)
+
+
+_catalog_lock = threading.Lock()
+_catalog: Optional[CatalogMatrix] = None
+
+
+def load_catalog_matrix(db: Session, version: Tuple = ()) -> CatalogMatrix:
+    """
+    Build a CatalogMatrix from the active programs (scoring columns only)
+
+    Rows are ordered by program id, so a catalog version always maps to the
+    same row order (stored score vectors rely on it).
+    """
+    rows = db.query(
+        Program.id,
+        Program.level,
+        Program.domain,
+        Program.required_bac_series,
+        Program.min_bac_grade,
+        Program.riasec_match,
+        Program.riasec_profile,
+        Program.employment_rate,
+        Program.annual_tuition,
+        Program.required_subjects
+    ).filter(Program.is_active == True).order_by(Program.id).all()
+    return CatalogMatrix(rows, version)
+
+
+def get_catalog_matrix(db: Session) -> CatalogMatrix:
+    """
+    Get the cached catalog matrix, rebuilding it if the catalog changed
+    """
+    global _catalog
+
+    version = catalog_version(db)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = load_catalog_matrix(db, version)
+        return _catalog
+
+
+def input_fingerprint(catalog: CatalogMatrix, context: StudentContext, algorithm_version: str = ALGORITHM_VERSION) -> str:
+    """
+    Hash of every input that can change a student's recommendations
+
+    Covers the Holland code (and the RIASEC dimension scores with vector
+    matching), bac grade, catalog series code, grades in subjects the
+    catalog requires, professional values, budget, user type, the catalog
+    version and the algorithm version.
+    """
+    relevant_grades = sorted(
+        (g.subject, float(g.grade)) for g in context.grades if g.subject in catalog.subject_index
+    )
+    values = None
+    if context.values is not None:
+        values = [getattr(context.values, name) for name in VALUE_FIELDS]
+
+    payload = json.dumps([
+        context.holland_code,
+        context.riasec_scores if algorithm_version == VECTOR_ALGORITHM_VERSION else None,
+        context.bac_grade,
+        catalog.eligibility.series_code(context.bac_series),
+        relevant_grades,
+        values,
+        context.max_annual_budget,
+        context.user_type,
+        catalog.version,
+        algorithm_version
+    ], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _riasec_scores(catalog: CatalogMatrix, holland_code: Optional[str], rows: np.ndarray) -> np.ndarray:
+    """RIASEC compatibility through the precomputed lookup table"""
+    if not holland_code:
+        return np.full(len(rows), 50.0)  # Neutral score without a test
+    return catalog.riasec_table.row(holland_code)[catalog.riasec_code_ids[rows]].astype(np.float64)
+
+
+def _riasec_vector_scores(
+    catalog: CatalogMatrix,
+    holland_code: Optional[str],
+    riasec_scores: Optional[Sequence[int]],
+    rows: np.ndarray
+) -> np.ndarray:
+    """
+    RIASEC fit as the correlation of the student's six dimension scores with
+    each program profile (-1 to 1 mapped to 0-100), one matrix-vector product
+    """
+    if riasec_scores is not None:
+        student = np.array(riasec_scores, dtype=np.float64)
+    elif holland_code:
+        student = holland_code_vector(holland_code)
+    else:
+        return np.full(len(rows), 50.0)  # Neutral score without a test
+
+    student = centered_unit_vectors(student[np.newaxis, :])[0]
+    if not student.any() and holland_code:
+        # Flat test scores carry no preference: fall back to the code
+        student = centered_unit_vectors(holland_code_vector(holland_code)[np.newaxis, :])[0]
+
+    return np.rint(50.0 + 50.0 * (catalog.riasec_vectors[rows] @ student))
+
+
+def _grades_scores(
+    catalog: CatalogMatrix,
+    bac_grade: Optional[int],
+    grades: Sequence,
+    rows: np.ndarray
+) -> np.ndarray:
+    """Academic fit: bac grade vs program minimum (70%), required subjects average (30%)"""
+    if not bac_grade:
+        return np.full(len(rows), 50.0)
+
+    min_grade = catalog.min_bac_grade[rows]
+
+    # Bac grade: 50-100 above the minimum, 0-49 below
+    above = np.where(
+        bac_grade >= 15, 100,
+        np.where(bac_grade >= min_grade + 2, 80, 60)
+    )
+    below = np.maximum(0, 50 - (min_grade - bac_grade) * 10)
+    bac_score = np.where(bac_grade >= min_grade, above, below)
+
+    # Subject grades: average of the student's grades in required subjects
+    subject_score = np.full(len(rows), 50.0)
+    if catalog.subject_index and grades:
+        sums = np.zeros(len(catalog.subject_index))
+        counts = np.zeros(len(catalog.subject_index))
+        for grade in grades:
+            col = catalog.subject_index.get(grade.subject)
+            if col is not None:
+                sums[col] += grade.grade
+                counts[col] += 1
+
+        membership = catalog.subject_matrix[rows]
+        total = membership @ sums
+        count = membership @ counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = np.where(count > 0, total / np.maximum(count, 1), 0)
+
+        graded = catalog.has_required_subjects[rows] & (count > 0)
+        subject_score = np.where(
+            graded,
+            np.select([avg >= 15, avg >= 12, avg >= 10], [100, 80, 60], 40),
+            subject_score
+        )
+
+    # Combined score (70% bac, 30% subjects)
+    combined = np.trunc(bac_score * 0.7 + subject_score * 0.3)
+    return np.where(catalog.has_min_bac_grade[rows], combined, 50)
+
+
+def _values_scores(catalog: CatalogMatrix, values, rows: np.ndarray) -> np.ndarray:
+    """Values alignment with the program's primary RIASEC letter (one lookup per letter)"""
+    by_letter = np.array(
+        [values_score_for_letter(values, letter) for letter in RIASEC_LETTERS] + [50],
+        dtype=np.float64
+    )
+    return by_letter[catalog.primary_letter[rows]]
+
+
+class WeightProfile:
+    """
+    Named set of component weights and financial thresholds
+
+    - **weights**: riasec, grades, values, employment and financial weights
+    - **financial_bands**: (budget ratio, score) pairs, checked in order
+    - **financial_default**: score when tuition exceeds every band
+    - **unknown_tuition_score**: score for programs without tuition
+      (None scores them as free)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        weights: Tuple[float, float, float, float, float],
+        financial_bands: Sequence[Tuple[float, int]],
+        financial_default: int,
+        unknown_tuition_score: Optional[int] = None
+    ):
+        self.name = name
+        self.riasec, self.grades, self.values, self.employment, self.financial = weights
+        self.financial_bands = tuple(financial_bands)
+        self.financial_default = financial_default
+        self.unknown_tuition_score = unknown_tuition_score
+
+
+# Stored recommendations and the PDF report
+GENERATION_PROFILE = WeightProfile(
+    "generation",
+    (0.30, 0.30, 0.20, 0.15, 0.05),
+    ((0.7, 100), (1.0, 80), (1.2, 60)),
+    financial_default=30,
+    unknown_tuition_score=50
+)
+
+# GET /programs/{id}/compatibility
+COMPATIBILITY_PROFILE = WeightProfile(
+    "compatibility",
+    (0.3, 0.25, 0.2, 0.15, 0.1),
+    ((1.0, 100), (1.2, 70), (1.5, 40)),
+    financial_default=20
+)
+
+WEIGHT_PROFILES = {p.name: p for p in (GENERATION_PROFILE, COMPATIBILITY_PROFILE)}
+
+
+def _financial_scores(
+    catalog: CatalogMatrix,
+    max_budget: Optional[int],
+    rows: np.ndarray,
+    weights: WeightProfile
+) -> np.ndarray:
+    """Financial feasibility: tuition vs student budget"""
+    if not max_budget:
+        return np.full(len(rows), 50.0)
+
+    tuition = catalog.annual_tuition[rows]
+    score = np.select(
+        [tuition <= max_budget * ratio for ratio, _ in weights.financial_bands],
+        [band_score for _, band_score in weights.financial_bands],
+        weights.financial_default
+    )
+    if weights.unknown_tuition_score is None:
+        return score
+    return np.where(catalog.has_tuition[rows], score, weights.unknown_tuition_score)
+
+
+def score_catalog(
+    catalog: CatalogMatrix,
+    context: StudentContext,
+    rows: Optional[np.ndarray] = None,
+    weights: WeightProfile = GENERATION_PROFILE,
+    algorithm_version: str = ALGORITHM_VERSION
+) -> Dict[str, np.ndarray]:
+    """
+    Score a student against the catalog
+
+    - **rows**: catalog row indices to score (defaults to every program)
+    - **weights**: weight profile (component weights and financial thresholds)
+    - **algorithm_version**: selects positional or vector RIASEC matching
+
+    Returns integer arrays aligned on ``rows``: riasec, grades, values,
+    employment, financial and the weighted total.
+    """
+    if rows is None:
+        rows = np.arange(catalog.size)
+
+    if algorithm_version == VECTOR_ALGORITHM_VERSION:
+        riasec = _riasec_vector_scores(catalog, context.holland_code, context.riasec_scores, rows)
+    else:
+        riasec = _riasec_scores(catalog, context.holland_code, rows)
+    grades_score = _grades_scores(catalog, context.bac_grade, context.grades, rows)
+    values_score = _values_scores(catalog, context.values, rows)
+    employment = catalog.employment_score[rows]
+    financial = _financial_scores(catalog, context.max_annual_budget, rows, weights)
+
+    # Weighted average, accumulated in component order
+    total = np.trunc(
+        riasec * weights.riasec +
+        grades_score * weights.grades +
+        values_score * weights.values +
+        employment * weights.employment +
+        financial * weights.financial
+    )
+
+    return {
+        "rows": rows,
+        "riasec": riasec.astype(np.int64),
+        "grades": grades_score.astype(np.int64),
+        "values": values_score.astype(np.int64),
+        "employment": employment.astype(np.int64),
+        "financial": financial.astype(np.int64),
+        "total": total.astype(np.int64),
+    }
+
+
+# Levels recommended to new bachelor students (Master is shown as a continuation)
+NEW_BACHELOR_LEVELS = ("Licence", "Ingenieur")
+
+# Maximum number of recommendations stored per student
+MAX_RECOMMENDATIONS = 20
+
+# Component order of packed score vectors
+SCORE_COMPONENTS = ("riasec", "grades", "values", "employment", "financial", "total")
+
+
+def score_program(program, context: StudentContext, weights: WeightProfile = COMPATIBILITY_PROFILE) -> Dict[str, int]:
+    """
+    Score a single program (active or not) with the catalog kernel
+
+    Returns a dict of ints: riasec, grades, values, employment, financial
+    and total.
+    """
+    scores = score_catalog(CatalogMatrix([program]), context, weights=weights)
+    return {key: int(value[0]) for key, value in scores.items() if key != "rows"}
+
+
+def score_programs(
+    catalog: CatalogMatrix,
+    context: StudentContext,
+    programs: Sequence,
+    weights: WeightProfile = COMPATIBILITY_PROFILE
+) -> Dict[str, Dict[str, int]]:
+    """
+    Score several programs at once, keyed by program id
+
+    Programs of the cached catalog are scored in one vectorized pass over
+    their rows; the others (inactive programs) through a small matrix of
+    their own.
+    """
+    results: Dict[str, Dict[str, int]] = {}
+
+    def collect(matrix: CatalogMatrix, rows: Optional[np.ndarray]):
+        scores = score_catalog(matrix, context, rows, weights)
+        for pos, row in enumerate(scores["rows"]):
+            results[matrix.ids[row]] = {
+                key: int(value[pos]) for key, value in scores.items() if key != "rows"
+            }
+
+    known = [catalog.row_index[p.id] for p in programs if p.id in catalog.row_index]
+    if known:
+        collect(catalog, np.array(known, dtype=np.intp))
+
+    others = [p for p in programs if p.id not in catalog.row_index]
+    if others:
+        collect(CatalogMatrix(others), None)
+
+    return results
+
+
+def top_k(total: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the ``k`` best totals, best first
+
+    Partial selection (argpartition) instead of a full sort; only the
+    winners are ordered. Ties keep catalog order, exactly like a stable
+    descending sort of the whole array.
+    """
+    size = total.size
+    if k <= 0 or size == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < size:
+        # Value of the k-th best total: everything above it wins, ties at
+        # the boundary are taken in catalog order
+        threshold = total[np.argpartition(total, size - k)[size - k]]
+        above = np.flatnonzero(total > threshold)
+        tied = np.flatnonzero(total == threshold)[:k - above.size]
+        winners = np.concatenate((above, tied))
+    else:
+        winners = np.arange(size)
+
+    # Best total first, then catalog order
+    return winners[np.lexsort((winners, -total[winners]))]
+
+
+def rank_programs(
+    catalog: CatalogMatrix,
+    context: StudentContext,
+    program_ids: Sequence[str],
+    limit: Optional[int] = None,
+    weights: WeightProfile = COMPATIBILITY_PROFILE
+) -> List[Tuple[str, int]]:
+    """
+    Rank catalog programs for a student, best total first
+
+    Returns (program_id, total) pairs for the best ``limit`` programs (all
+    by default). Ties keep the order of ``program_ids``; ids missing from
+    the catalog are skipped.
+    """
+    known = [program_id for program_id in program_ids if program_id in catalog.row_index]
+    rows = np.array([catalog.row_index[program_id] for program_id in known], dtype=np.intp)
+    total = score_catalog(catalog, context, rows, weights)["total"]
+
+    best = top_k(total, len(known) if limit is None else limit)
+    return [(known[pos], int(total[pos])) for pos in best]
+
+
+def eligible_mask(catalog: CatalogMatrix, context: StudentContext) -> np.ndarray:
+    """Programs whose bac series and minimum grade prerequisites the student meets"""
+    return catalog.eligibility.mask(context.bac_series, context.bac_grade)
+
+
+def eligible_program_ids(catalog: CatalogMatrix, context: StudentContext, program_ids: Sequence[str]) -> List[str]:
+    """Keep the catalog programs the student can enter, in the given order"""
+    mask = eligible_mask(catalog, context)
+    return [
+        program_id for program_id in program_ids
+        if program_id in catalog.row_index and mask[catalog.row_index[program_id]]
+    ]
+
+
+def candidate_rows(catalog: CatalogMatrix, context: StudentContext) -> np.ndarray:
+    """
+    Catalog rows a student can be recommended
+
+    New bachelor students get the Licence and Ingenieur programs whose entry
+    prerequisites they meet.
+    """
+    if context.user_type == "new_bachelor":
+        return np.flatnonzero(catalog.level_mask(NEW_BACHELOR_LEVELS) & eligible_mask(catalog, context))
+    return np.arange(catalog.size)
+
+
+def score_candidates(catalog: CatalogMatrix, context: StudentContext) -> Dict[str, np.ndarray]:
+    """
+    Score only the candidate rows, as whole-catalog arrays (0 elsewhere)
+
+    Pruned programs are never scored; the result can be packed as a score
+    vector and reused with recommend_for_student(scores=...).
+    """
+    rows = candidate_rows(catalog, context)
+    partial = score_catalog(catalog, context, rows)
+
+    scores = {key: np.zeros(catalog.size, dtype=np.int64) for key in SCORE_COMPONENTS}
+    for key in SCORE_COMPONENTS:
+        scores[key][rows] = partial[key]
+    scores["rows"] = np.arange(catalog.size)
+    return scores
+
+
+def build_explanations(scores: Dict[str, int]) -> Tuple[List[str], List[str], str]:
+    """
+    Build strengths, weaknesses and advice texts from component scores
+
+    - **scores**: dict with total, riasec, grades, values, employment and financial
+    """
+    riasec_score = scores["riasec"]
+    grades_score = scores["grades"]
+    values_score = scores["values"]
+    employment_score = scores["employment"]
+    financial_score = scores["financial"]
+    total_score = scores["total"]
+
+    strengths = []
+    weaknesses = []
+
+    if riasec_score >= 70:
+        strengths.append(f"Excellente compatibilité de personnalité ({riasec_score}%)")
+    elif riasec_score >= 50:
+        strengths.append(f"Bonne compatibilité de personnalité ({riasec_score}%)")
+    else:
+        weaknesses.append(f"Compatibilité de personnalité limitée ({riasec_score}%)")
+
+    if grades_score >= 70:
+        strengths.append(f"Votre profil académique est très adapté ({grades_score}%)")
+    elif grades_score >= 50:
+        strengths.append(f"Votre profil académique est adapté ({grades_score}%)")
+    else:
+        weaknesses.append(f"Votre profil académique pourrait nécessiter un effort supplémentaire ({grades_score}%)")
+
+    if values_score >= 70:
+        strengths.append(f"Alignement fort avec vos valeurs professionnelles ({values_score}%)")
+    elif values_score < 50:
+        weaknesses.append(f"Alignement limité avec vos valeurs professionnelles ({values_score}%)")
+
+    if employment_score >= 70:
+        strengths.append(f"Excellent taux d'insertion professionnelle ({employment_score}%)")
+    elif employment_score < 50:
+        weaknesses.append(f"Taux d'insertion professionnelle à considérer ({employment_score}%)")
+
+    if financial_score >= 80:
+        strengths.append("Les frais sont bien adaptés à votre budget")
+    elif financial_score < 50:
+        weaknesses.append("Les frais dépassent votre budget prévu")
+
+    # Generate advice
+    if total_score >= 75:
+        advice = "Cette formation est fortement recommandée pour votre profil. Elle correspond bien à vos aspirations et capacités."
+    elif total_score >= 60:
+        advice = "Cette formation est recommandée pour votre profil. Assurez-vous de bien comprendre les exigences."
+    elif total_score >= 45:
+        advice = "Cette formation pourrait vous convenir, mais nécessite une attention particulière aux domaines moins compatibles."
+    else:
+        advice = "Cette formation présente des défis importants par rapport à votre profil. Explorez d'autres options mieux adaptées."
+
+    return strengths, weaknesses, advice
+
+
+def recommend_for_student(
+    catalog: CatalogMatrix,
+    context: StudentContext,
+    limit: int = MAX_RECOMMENDATIONS,
+    rows: Optional[np.ndarray] = None,
+    scores: Optional[Dict[str, np.ndarray]] = None
+) -> List[Dict]:
+    """
+    Rank the catalog for a student and explain the best ``limit`` programs
+
+    - **rows**: catalog rows to choose from (defaults to candidate_rows)
+    - **scores**: scores of the whole catalog when already computed or
+      unpacked from a stored score vector
+
+    Returns entries ready for recommendation_store.build_rows, best first.
+    """
+    if rows is None:
+        rows = candidate_rows(catalog, context)
+    if scores is None:
+        scores = score_catalog(catalog, context, rows)
+        positions = top_k(scores["total"], limit)
+    else:
+        positions = rows[top_k(scores["total"][rows], limit)]
+
+    # Select the best programs without sorting the whole catalog; explanation
+    # texts are only built for them
+    entries = []
+    for pos in positions:
+        component_scores = {key: int(scores[key][pos]) for key in SCORE_COMPONENTS}
+        strengths, weaknesses, advice = build_explanations(component_scores)
+
+        entries.append({
+            "program_id": catalog.ids[scores["rows"][pos]],
+            "total_score": component_scores["total"],
+            "riasec_score": component_scores["riasec"],
+            "grades_score": component_scores["grades"],
+            "values_score": component_scores["values"],
+            "employment_score": component_scores["employment"],
+            "financial_score": component_scores["financial"],
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "advice": advice
+        })
+
+    return entries
+
+
+def pack_scores(scores: Dict[str, np.ndarray]) -> bytes:
+    """
+    Pack whole-catalog scores into bytes (one uint8 per component and program)
+
+    - **scores**: score_catalog output computed over every catalog row
+    """
+    return np.stack([scores[key] for key in SCORE_COMPONENTS]).astype(np.uint8).tobytes()
+
+
+def unpack_scores(data: bytes, size: int) -> Dict[str, np.ndarray]:
+    """Inverse of pack_scores, aligned on the catalog rows"""
+    matrix = np.frombuffer(data, dtype=np.uint8).reshape(len(SCORE_COMPONENTS), size).astype(np.int64)
+    scores = {key: matrix[i] for i, key in enumerate(SCORE_COMPONENTS)}
+    scores["rows"] = np.arange(size)
+    return scores
+
+
+def filter_rows(
+    catalog: CatalogMatrix,
+    rows: np.ndarray,
+    level: Optional[str] = None,
+    domain: Optional[str] = None,
+    max_budget: Optional[int] = None
+) -> np.ndarray:
+    """Keep the rows matching the GET /programs style filters"""
+    mask = np.ones(len(rows), dtype=bool)
+    if level:
+        mask &= catalog.levels[rows] == level
+    if domain:
+        mask &= catalog.domains[rows] == domain
+    if max_budget:
+        mask &= catalog.annual_tuition[rows] <= max_budget
+    return rows[mask]
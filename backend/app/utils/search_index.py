@@ -0,0 +1,211 @@
+"""
+In-process full-text index of the program catalog
+
+French-aware inverted index used by GET /programs/search: text is
+unaccented, lowercased, split into words, stripped of French stop words
+and plural endings. Fields are weighted like a Postgres tsvector (name and
+code A, department B, description D) and results are ranked by a tf-idf
+score. Query words also match as prefixes ("info" finds "informatique")
+and, for the words of program and department names, with one or two
+typos ("infomatique", "genei civil"): a trigram index narrows the
+vocabulary down to a few candidates checked with a bounded edit distance.
+Exact words rank above prefixes, prefixes above typo matches.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Field weights, as ts_rank's default {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}
+FIELD_WEIGHTS = {
+    "name": 1.0,
+    "code": 1.0,
+    "department": 0.4,
+    "description": 0.1,
+}
+
+# Share of the score kept when a word only matches as a prefix, or with typos
+PREFIX_MATCH_FACTOR = 0.5
+FUZZY_MATCH_FACTOR = 0.3
+
+# Fields whose words are matched with typo tolerance
+FUZZY_FIELDS = ("name", "department")
+
+FRENCH_STOP_WORDS = frozenset({
+    "a", "au", "aux", "avec", "ce", "ces", "d", "dans", "de", "des", "du", "en", "et",
+    "l", "la", "le", "les", "leur", "leurs", "ou", "par", "pour", "qu", "que", "qui",
+    "sa", "se", "ses", "son", "sur", "un", "une",
+})
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def unaccent(text: str) -> str:
+    """Remove diacritics: "Génie Électrique" gives "Genie Electrique" """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_word(word: str) -> str:
+    """Light French stemming: drop plural endings ("sciences" -> "science")"""
+    if len(word) > 3 and word[-1] in "sx" and not word[-2].isdigit():
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Unaccented, lowercased, stemmed words of ``text`` without stop words"""
+    return [
+        normalize_word(word)
+        for word in _WORD_RE.findall(unaccent(text or "").lower())
+        if word not in FRENCH_STOP_WORDS
+    ]
+
+
+def max_typos(word: str) -> int:
+    """Typos tolerated in a query word: none below 4 letters, 2 from 8 letters"""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def trigrams(word: str) -> set:
+    """Trigrams of a word padded with boundary markers ("$in", "inf", ...)"""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance of ``a`` and ``b`` counting a swap of adjacent letters as
+    one typo (optimal string alignment), or ``max_distance + 1`` when larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if before is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class SearchIndex:
+    """
+    Inverted index: term -> {document position: weighted term frequency}
+
+    Documents are identified by their position in ``documents`` (the
+    caller's order, also used to break ties between equal scores).
+    """
+
+    def __init__(self, documents: Sequence[Dict[str, str]]):
+        self.size = len(documents)
+        self.postings: Dict[str, Dict[int, float]] = {}
+
+        fuzzy_terms = set()
+        for position, document in enumerate(documents):
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(document.get(field) or ""):
+                    postings = self.postings.setdefault(term, {})
+                    postings[position] = postings.get(position, 0.0) + weight
+                    if field in FUZZY_FIELDS:
+                        fuzzy_terms.add(term)
+
+        # Trigram -> name and department terms containing it
+        self.trigram_index: Dict[str, List[str]] = {}
+        for term in sorted(fuzzy_terms):
+            for gram in trigrams(term):
+                self.trigram_index.setdefault(gram, []).append(term)
+
+        self.vocabulary: List[str] = sorted(self.postings)
+        self.idf: Dict[str, float] = {
+            term: math.log(1.0 + self.size / len(postings)) for term, postings in self.postings.items()
+        }
+
+    def _prefix_terms(self, prefix: str) -> Iterable[str]:
+        """Indexed terms starting with ``prefix``"""
+        start = bisect_left(self.vocabulary, prefix)
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def _fuzzy_terms(self, word: str) -> Dict[str, int]:
+        """
+        Name and department terms within ``max_typos`` edits of ``word``
+
+        A typo changes at most four trigrams (three for an insertion,
+        deletion or substitution, four for a swap), so only terms sharing
+        enough trigrams with the word are compared. Returns term -> distance.
+        """
+        typos = max_typos(word)
+        if not typos:
+            return {}
+
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self.trigram_index.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        needed = len(grams) - 4 * typos
+        matches = {}
+        for term, count in shared.items():
+            if count >= needed and term != word:
+                distance = bounded_edit_distance(word, term, typos)
+                if distance <= typos:
+                    matches[term] = distance
+        return matches
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        """Best score of one query word per matching document (exact, prefix or typo match)"""
+        factors = {term: (1.0 if term == word else PREFIX_MATCH_FACTOR) for term in self._prefix_terms(word)}
+        for term, distance in self._fuzzy_terms(word).items():
+            factors.setdefault(term, FUZZY_MATCH_FACTOR / distance)
+
+        scores: Dict[int, float] = {}
+        for term, factor in factors.items():
+            idf = self.idf[term]
+            for position, frequency in self.postings[term].items():
+                score = frequency * idf * factor
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+        return scores
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Documents containing every query word, best score first
+
+        Returns (position, score) pairs; equal scores keep document order.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        matches = None
+        for word in words:
+            word_scores = self._word_scores(word)
+            if matches is None:
+                matches = word_scores
+            else:
+                matches = {
+                    position: score + word_scores[position]
+                    for position, score in matches.items()
+                    if position in word_scores
+                }
+            if not matches:
+                return []
+
+        return sorted(matches.items(), key=lambda match: (-match[1], match[0]))
@@ -0,0 +1,172 @@
+"""
+Similar-programs nearest-neighbour index
+
+Each active program is described by a feature vector: RIASEC profile,
+domain, level, annual cost, employment rate and the subjects it teaches
+(ProgramSubject). The nearest neighbours of every program are computed
+once per catalog version, so a lookup is a dictionary access and a slice.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.program import ProgramSubject
+from app.utils.catalog_snapshot import get_catalog_snapshot
+from app.utils.scoring import CatalogMatrix, get_catalog_matrix
+
+# Neighbours kept per program (upper bound of GET /programs/{id}/similar)
+MAX_SIMILAR = 20
+
+# Share of each feature in the similarity (sums to 1)
+SIMILARITY_WEIGHTS = {
+    "riasec": 0.35,
+    "domain": 0.15,
+    "level": 0.15,
+    "subjects": 0.15,
+    "cost": 0.10,
+    "employment": 0.10,
+}
+
+# Rows compared against the whole catalog at once while building
+_CHUNK_SIZE = 256
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _category_ids(values: Sequence[Optional[str]]) -> np.ndarray:
+    """Integer id per distinct value, -1 for missing values"""
+    index: Dict[str, int] = {}
+    return np.array(
+        [index.setdefault(value, len(index)) if value else -1 for value in values],
+        dtype=np.int32
+    )
+
+
+def _subject_vectors(size: int, subjects: Sequence[Sequence[str]]) -> np.ndarray:
+    """Unit subject membership vectors: dot products are cosine overlaps"""
+    vocabulary: Dict[str, int] = {}
+    for names in subjects:
+        for name in names:
+            vocabulary.setdefault(name, len(vocabulary))
+
+    vectors = np.zeros((size, len(vocabulary)), dtype=np.float32)
+    for i, names in enumerate(subjects):
+        for name in names:
+            vectors[i, vocabulary[name]] = 1.0
+    return _normalize_rows(vectors)
+
+
+class SimilarityIndex:
+    """
+    Precomputed nearest neighbours of every active program
+
+    ``neighbours[i]`` holds the catalog rows most similar to row ``i`` (best
+    first, the program itself excluded) and ``similarity[i]`` their scores
+    from 0 to 100.
+    """
+
+    def __init__(
+        self,
+        catalog: CatalogMatrix,
+        subjects: Dict[str, List[str]],
+        version: Tuple = (),
+        k: int = MAX_SIMILAR
+    ):
+        self.version = version
+        self.ids = catalog.ids
+        self.row_index = catalog.row_index
+        size = catalog.size
+        self.k = min(k, max(size - 1, 0))
+
+        # Centered unit RIASEC profiles: dot products are correlations
+        riasec = catalog.riasec_vectors.astype(np.float32)
+        domains = _category_ids(catalog.domains)
+        levels = _category_ids(catalog.levels)
+        subject_vectors = _subject_vectors(size, [subjects.get(program_id, []) for program_id in self.ids])
+
+        # Costs on a log scale, employment rates as fractions
+        tuition = np.log1p(catalog.annual_tuition).astype(np.float32)
+        cost = tuition / tuition.max() if size and tuition.max() > 0 else np.zeros(size, dtype=np.float32)
+        employment = (catalog.employment_score / 100.0).astype(np.float32)
+
+        w = SIMILARITY_WEIGHTS
+        self.neighbours = np.zeros((size, self.k), dtype=np.int32)
+        self.similarity = np.zeros((size, self.k), dtype=np.int16)
+
+        for start in range(0, size, _CHUNK_SIZE):
+            chunk = slice(start, min(start + _CHUNK_SIZE, size))
+            scores = (
+                w["riasec"] * (1.0 + riasec[chunk] @ riasec.T) / 2
+                + w["domain"] * ((domains[chunk, None] == domains[None, :]) & (domains[chunk, None] >= 0))
+                + w["level"] * (levels[chunk, None] == levels[None, :])
+                + w["subjects"] * (subject_vectors[chunk] @ subject_vectors.T)
+                + w["cost"] * (1.0 - np.abs(cost[chunk, None] - cost[None, :]))
+                + w["employment"] * (1.0 - np.abs(employment[chunk, None] - employment[None, :]))
+            )
+
+            # A program is not its own neighbour
+            rows = np.arange(chunk.start, chunk.stop)
+            scores[rows - start, rows] = -np.inf
+
+            if self.k:
+                best = np.argpartition(-scores, self.k - 1, axis=1)[:, :self.k]
+                best_scores = np.take_along_axis(scores, best, axis=1)
+                order = np.lexsort((best, -best_scores), axis=1)
+                self.neighbours[chunk] = np.take_along_axis(best, order, axis=1)
+                self.similarity[chunk] = np.rint(np.take_along_axis(best_scores, order, axis=1) * 100)
+
+    def similar(self, program_id: str, limit: int = MAX_SIMILAR) -> Optional[List[Tuple[str, int]]]:
+        """
+        Most similar programs as (program_id, similarity) pairs, best first
+
+        Returns None when the program is not in the index (unknown or inactive).
+        """
+        row = self.row_index.get(program_id)
+        if row is None:
+            return None
+        return [
+            (self.ids[neighbour], int(score))
+            for neighbour, score in zip(self.neighbours[row, :limit], self.similarity[row, :limit])
+        ]
+
+
+def load_program_subjects(db: Session) -> Dict[str, List[str]]:
+    """Normalized subject names per program id"""
+    subjects: Dict[str, List[str]] = {}
+    for program_id, name in db.query(ProgramSubject.program_id, ProgramSubject.name):
+        normalized = " ".join(name.lower().split())
+        if normalized:
+            subjects.setdefault(program_id, []).append(normalized)
+    return subjects
+
+
+_index_lock = threading.Lock()
+_index: Optional[SimilarityIndex] = None
+
+
+def get_similarity_index(db: Session) -> SimilarityIndex:
+    """
+    Get the cached similarity index, rebuilding it if the catalog or the
+    program subjects changed
+
+    Keyed on the catalog snapshot version (programs and subjects), which is
+    only checked every SNAPSHOT_CHECK_INTERVAL seconds: a lookup normally
+    runs no query.
+    """
+    global _index
+
+    version = get_catalog_snapshot(db).version
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = SimilarityIndex(get_catalog_matrix(db), load_program_subjects(db), version)
+        return _index
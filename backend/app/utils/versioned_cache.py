@@ -0,0 +1,52 @@
+"""
+Process-wide cache of a value derived from the database
+
+The value is rebuilt when its version stamp changes; the stamp itself is
+checked at most every SNAPSHOT_CHECK_INTERVAL seconds, so most reads do
+not touch the database.
+"""
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.utils.catalog_snapshot import SNAPSHOT_CHECK_INTERVAL
+
+
+class VersionedCache:
+    """
+    ``build(db)`` cached per ``version(db)`` stamp
+
+    ``get`` returns the (version, value) pair, the version being suitable
+    for an ETag.
+    """
+
+    def __init__(
+        self,
+        version: Callable[[Session], Tuple],
+        build: Callable[[Session], Any],
+        interval: float = SNAPSHOT_CHECK_INTERVAL
+    ):
+        self.version = version
+        self.build = build
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[Tuple, Any]] = None
+        self._checked_at = 0.0
+
+    def get(self, db: Session) -> Tuple[Tuple, Any]:
+        """Current (version, value), rebuilt if the version changed"""
+        entry = self._entry
+        if entry is not None and time.monotonic() - self._checked_at < self.interval:
+            return entry
+
+        with self._lock:
+            if self._entry is not None and time.monotonic() - self._checked_at < self.interval:
+                return self._entry
+
+            version = self.version(db)
+            if self._entry is None or self._entry[0] != version:
+                self._entry = (version, self.build(db))
+            self._checked_at = time.monotonic()
+            return self._entry
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the shared scoring kernel (app/utils/scoring.py)
+
+Covers the three call sites: recommendation generation (and the PDF report,
+which uses the same path), single-program compatibility and the fleet-wide
+regeneration, with both RIASEC matching modes. Runs on a synthetic catalog, no database needed:
+    python benchmark_scoring.py [--programs 5000] [--students 200]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.utils.scoring import (
+    COMPATIBILITY_PROFILE,
+    GENERATION_PROFILE,
+    POSITIONAL_ALGORITHM_VERSION,
+    VECTOR_ALGORITHM_VERSION,
+    CatalogMatrix,
+    Grade,
+    StudentContext,
+    VALUE_FIELDS,
+    candidate_rows,
+    filter_rows,
+    input_fingerprint,
+    pack_scores,
+    recommend_for_student,
+    score_catalog,
+    score_program,
+    unpack_scores
+)
+
+SUBJECTS = ["Mathématiques", "Physique", "Chimie", "SVT", "Français", "Anglais", "Histoire", "Philosophie"]
+LEVELS = ["Licence", "Master", "Ingenieur", "Doctorat"]
+HOLLAND_CODES = ["".join(p) for p in itertools.permutations("RIASEC", 3)]
+
+
+def synthetic_programs(count):
+    """Program-like rows with the columns the kernel reads"""
+    return [
+        SimpleNamespace(
+            id=f"program-{i}",
+            level=random.choice(LEVELS),
+            domain=random.choice(["Sciences", "Lettres", "Droit", None]),
+            required_bac_series=random.sample(["A", "C", "D", "E", "TI"], random.randint(1, 3)),
+            min_bac_grade=random.choice([None, 10, 11, 12, 14]),
+            riasec_match=random.choice(HOLLAND_CODES),
+            riasec_profile=random.choice([None, {letter: random.randint(0, 100) for letter in "RIASEC"}]),
+            employment_rate=random.choice([None, 40, 65, 80, 95]),
+            annual_tuition=random.choice([0, 50000, 100000, 350000, 1000000]),
+            required_subjects=random.sample(SUBJECTS, random.randint(0, 3))
+        )
+        for i in range(count)
+    ]
+
+
+def synthetic_students(count):
+    """Detached student contexts"""
+    return [
+        StudentContext(
+            student_id=f"student-{i}",
+            holland_code=random.choice(HOLLAND_CODES),
+            riasec_scores=[random.randint(0, 100) for _ in range(6)],
+            bac_grade=random.choice([None, 9, 11, 13, 16]),
+            bac_series=random.choice([None, "A (Littéraire)", "C (Math-Physique)", "D (Math-Sciences)"]),
+            max_annual_budget=random.choice([None, 100000, 400000]),
+            user_type=random.choice(["new_bachelor", "university_student"]),
+            grades=[Grade(s, round(random.uniform(5, 19), 1)) for s in random.sample(SUBJECTS, 4)],
+            values=SimpleNamespace(**{name: random.randint(1, 5) for name in VALUE_FIELDS})
+        )
+        for i in range(count)
+    ]
+
+
+def bench(label, func, repeat):
+    """Run ``func`` ``repeat`` times and print the mean duration"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed / repeat * 1000:9.3f} ms/op  ({repeat} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scoring kernel")
+    parser.add_argument("--programs", type=int, default=5000, help="Catalog size")
+    parser.add_argument("--students", type=int, default=200, help="Students for the fleet benchmark")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    programs = synthetic_programs(args.programs)
+    students = synthetic_students(args.students)
+    student = students[0]
+
+    print(f"Catalog: {args.programs} programs, {args.students} students\n")
+
+    start = time.perf_counter()
+    catalog = CatalogMatrix(programs, version=(args.programs,))
+    print(f"  {'Build catalog matrix':<45} {(time.perf_counter() - start) * 1000:9.3f} ms")
+
+    print("\nGeneration (POST /recommendations/generate, PDF report)")
+    rows = candidate_rows(catalog, student)
+    bench("score_catalog (generation profile)", lambda: score_catalog(catalog, student, rows, GENERATION_PROFILE), 200)
+    bench("  positional RIASEC matching (1.1)", lambda: score_catalog(
+        catalog, student, algorithm_version=POSITIONAL_ALGORITHM_VERSION), 200)
+    bench("  vector RIASEC matching (2.0)", lambda: score_catalog(
+        catalog, student, algorithm_version=VECTOR_ALGORITHM_VERSION), 200)
+    bench("recommend_for_student (top 20 + texts)", lambda: recommend_for_student(catalog, student), 200)
+    bench("input_fingerprint", lambda: input_fingerprint(catalog, student), 200)
+
+    print("\nCompatibility (GET /programs/{id}/compatibility)")
+    bench("score_program (compatibility profile)", lambda: score_program(programs[0], student, COMPATIBILITY_PROFILE), 500)
+    bench("score_catalog (compatibility profile)", lambda: score_catalog(catalog, student, weights=COMPATIBILITY_PROFILE), 200)
+
+    print("\nFiltered re-ranking (GET /recommendations?level=...)")
+    packed = pack_scores(score_catalog(catalog, student))
+    bench("unpack stored vector + filter + top 20", lambda: recommend_for_student(
+        catalog, student,
+        rows=filter_rows(catalog, rows, level="Licence"),
+        scores=unpack_scores(packed, catalog.size)
+    ), 200)
+
+    print("\nFleet regeneration (regenerate_recommendations.py)")
+    start = time.perf_counter()
+    for context in students:
+        recommend_for_student(catalog, context)
+    elapsed = time.perf_counter() - start
+    print(f"  {'recommend_for_student per student':<45} {elapsed / len(students) * 1000:9.3f} ms/op  "
+          f"({len(students) / elapsed:.0f} students/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,216 @@
-"""Regenerate recommendations for all students"""
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Regenerate recommendations for all students
+
+Run after a catalog or weights change:
+    python regenerate_recommendations.py [--workers 4] [--chunk-size 500]
+
+Students are streamed by id in chunks. Each chunk is scored in worker
+processes and written back with one bulk DELETE + INSERT. Progress is
+checkpointed by student id, so an interrupted run resumes with --resume.
+"""
+import argparse
+import json
+import os
 import sys
-sys.path.insert(0, 'C:\\Users\\GBK TECH\\backend')
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.database import SessionLocal
-from app.models.recommendation import Recommendation
 from app.models.student_profile import StudentProfile
+from app.utils.recommendation_store import build_rows, build_score_vector, replace_recommendations
+from app.utils.scoring import (
+    ALGORITHM_VERSION,
+    StudentContext,
+    get_catalog_matrix,
+    input_fingerprint,
+    recommend_for_student,
+    score_candidates
+)
+
+DEFAULT_CHECKPOINT = "regenerate_recommendations.checkpoint.json"
+
+# Catalog shared by every task of a worker process (set by _init_worker)
+_worker_catalog = None
+
+
+def _init_worker(catalog):
+    """Receive the catalog matrix once per worker process"""
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def score_chunk(contexts):
+    """
+    Score a chunk of students (runs in a worker process)
+
+    Returns (student_id, fingerprint, entries, score_vector) for every
+    student that can be scored. The score vector is packed here so that
+    only bytes travel back to the parent process.
+    """
+    results = []
+    for context in contexts:
+        # Same prerequisites as POST /recommendations/generate
+        if not context.holland_code or not context.values:
+            continue
+        fingerprint = input_fingerprint(_worker_catalog, context)
+        scores = score_candidates(_worker_catalog, context)
+        results.append((
+            context.student_id,
+            fingerprint,
+            recommend_for_student(_worker_catalog, context, scores=scores),
+            build_score_vector(context.student_id, _worker_catalog, scores, fingerprint)
+        ))
+    return results
+
+
+def read_checkpoint(path):
+    """Return the saved checkpoint, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(path, state):
+    """Atomically save the checkpoint"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def iter_chunks(db, after_id, chunk_size):
+    """Yield (student_ids, detached contexts) chunks ordered by student id"""
+    last_id = after_id
+    while True:
+        query = db.query(StudentProfile).order_by(StudentProfile.id)
+        if last_id:
+            query = query.filter(StudentProfile.id > last_id)
+        profiles = query.limit(chunk_size).all()
+
+        if not profiles:
+            return
+
+        contexts = [c.detached() for c in StudentContext.load_many(db, profiles)]
+        last_id = profiles[-1].id
+        db.expunge_all()
+
+        yield [p.id for p in profiles], contexts
+
+
+def run(workers, chunk_size, checkpoint_path, resume):
+    db = SessionLocal()
+
+    try:
+        state = read_checkpoint(checkpoint_path) if resume else None
+        if state:
+            print(f"[RESUME] Continuing after student {state['last_student_id']} "
+                  f"({state['processed']} already processed)")
+        else:
+            state = {
+                "last_student_id": None,
+                "processed": 0,
+                "written": 0,
+                "skipped": 0,
+                "started_at": datetime.utcnow().isoformat()
+            }
+
+        total = db.query(StudentProfile).count()
+        catalog = get_catalog_matrix(db)
+        print(f"Found {total} student profiles, {catalog.size} active programs")
+        print(f"Scoring with {workers} worker process(es), chunks of {chunk_size}")
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog,))
+        else:
+            _init_worker(catalog)
+
+        start = time.monotonic()
+        processed_this_run = 0
+        pending = deque()
+
+        def flush(student_ids, results):
+            nonlocal processed_this_run
+
+            rows = []
+            vectors = []
+            for student_id, fingerprint, entries, vector in results:
+                rows.extend(build_rows(
+                    student_id, entries,
+                    algorithm_version=ALGORITHM_VERSION,
+                    input_fingerprint=fingerprint
+                ))
+                vectors.append(vector)
+
+            # Students without RIASEC test or values lose their stale recommendations
+            replace_recommendations(db, student_ids, rows, score_vectors=vectors)
+
+            processed_this_run += len(student_ids)
+            state["processed"] += len(student_ids)
+            state["written"] += len(results)
+            state["skipped"] += len(student_ids) - len(results)
+            state["last_student_id"] = student_ids[-1]
+            state["updated_at"] = datetime.utcnow().isoformat()
+            write_checkpoint(checkpoint_path, state)
+
+            elapsed = time.monotonic() - start
+            rate = processed_this_run / elapsed if elapsed > 0 else 0.0
+            remaining = max(total - state["processed"], 0)
+            eta = remaining / rate if rate > 0 else 0.0
+            print(f"  {state['processed']}/{total} students "
+                  f"({rate:.1f} students/sec, ETA {eta:.0f}s)", flush=True)
+
+        try:
+            for student_ids, contexts in iter_chunks(db, state["last_student_id"], chunk_size):
+                if executor:
+                    pending.append((student_ids, executor.submit(score_chunk, contexts)))
+
+                    # Keep a bounded number of chunks in flight, write them in order
+                    while len(pending) > workers * 2:
+                        done_ids, future = pending.popleft()
+                        flush(done_ids, future.result())
+                else:
+                    flush(student_ids, score_chunk(contexts))
+
+            while pending:
+                done_ids, future = pending.popleft()
+                flush(done_ids, future.result())
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+        elapsed = time.monotonic() - start
+        rate = processed_this_run / elapsed if elapsed > 0 else 0.0
+        print(f"\n[OK] {state['processed']} students processed: {state['written']} regenerated, "
+              f"{state['skipped']} skipped (missing RIASEC test or values)")
+        print(f"[OK] {processed_this_run} students in {elapsed:.1f}s ({rate:.1f} students/sec)")
+
+        # Completed run: the checkpoint is no longer needed
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    finally:
+        db.close()
 
-db = SessionLocal()
 
-try:
-    # Get all student profiles
-    profiles = db.query(StudentProfile).all()
-    print(f"Found {len(profiles)} student profiles")
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate recommendations for all students")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of scoring processes (1 = score in this process)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Students per chunk")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--resume", action="store_true", help="Resume from the checkpoint file")
+    args = parser.parse_args()
 
-    # Delete all existing recommendations
-    deleted_count = db.query(Recommendation).delete()
-    db.commit()
-    print(f"Deleted {deleted_count} old recommendations")
+    run(max(args.workers, 1), max(args.chunk_size, 1), args.checkpoint, args.resume)
 
-    print("\nRecommendations deleted successfully.")
-    print("Please click 'Générer de nouvelles recommandations' on the /recommendations page")
 
-finally:
-    db.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Bac series pruning of new bachelor candidates
+Run with: python test_bac_series_eligibility.py (or pytest)
+
+Builds the scoring catalog from in-memory rows: no database is needed.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from types import SimpleNamespace
+
+from app.utils.scoring import CatalogMatrix, StudentContext, candidate_rows, normalize_bac_series
+
+# The series spellings of the seeded catalog
+SERIES_GROUPS = [
+    ["A", "B", "Litteraire", "GCE A/Level"],
+    ["C", "D", "E", "F", "BT"],
+    ["A", "C", "D"],
+    [],
+]
+
+
+def build_catalog():
+    """One Licence per series group"""
+    rows = [
+        SimpleNamespace(
+            id=f"P{i}", level="Licence", domain="Sciences", required_bac_series=series,
+            min_bac_grade=None, riasec_match="IRA", riasec_profile=None,
+            employment_rate=70, annual_tuition=100000, required_subjects=[]
+        )
+        for i, series in enumerate(SERIES_GROUPS)
+    ]
+    return CatalogMatrix(rows, version=(len(rows),))
+
+
+def candidates(catalog, bac_series):
+    """Candidate program ids of a new bachelor with this bac series"""
+    context = StudentContext(None, "IRA", None, None, "new_bachelor", [], None, bac_series=bac_series)
+    return [catalog.ids[row] for row in candidate_rows(catalog, context)]
+
+
+def test_series_aliases():
+    """Profile labels and catalog spellings map to one code each"""
+    assert normalize_bac_series("C (Math-Physique)") == "C"
+    assert normalize_bac_series("Série c") == "C"
+    assert normalize_bac_series("TI (Technique Industriel)") == "TI"
+    assert normalize_bac_series("GCE A/Level") == "GCE A/LEVEL"
+    assert normalize_bac_series("GCE A Level") == "GCE A/LEVEL"
+    assert normalize_bac_series("G (Commercial)") != normalize_bac_series("GCE A/Level")
+    assert normalize_bac_series("  ") is None
+    assert normalize_bac_series(None) is None
+    print("✓ Bac series aliases")
+
+
+def test_known_series_prunes():
+    """A series the catalog lists keeps only the programs open to it"""
+    catalog = build_catalog()
+    assert candidates(catalog, "C (Math-Physique)") == ["P1", "P2", "P3"]
+    assert candidates(catalog, "A (Littéraire)") == ["P0", "P2", "P3"]
+    assert candidates(catalog, "GCE A/Level") == ["P0", "P3"]
+    print("✓ Known series prune the catalog")
+
+
+def test_unknown_or_missing_series_keeps_everything():
+    """A series no program lists is treated like a missing one"""
+    catalog = build_catalog()
+    everything = list(catalog.ids)
+    for series in ("G (Commercial)", "TI (Technique Industriel)", None, ""):
+        assert candidates(catalog, series) == everything, series
+    print("✓ Unknown and missing series keep every program")
+
+
+if __name__ == "__main__":
+    test_series_aliases()
+    test_known_series_prunes()
+    test_unknown_or_missing_series_keeps_everything()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Catalog snapshot tests: listing cursors, facet counts and typo-tolerant search
+Run with: python test_catalog_snapshot.py (or pytest)
+
+Seeds a throwaway in-memory SQLite database, so it never touches Supabase.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401 - register every table
+from app.models.program import Program
+from app.api.v1.endpoints.programs import build_program_page
+from app.utils.catalog_snapshot import decode_cursor, encode_cursor, load_catalog_snapshot
+
+LEVELS = ["Licence", "Master", "Ingenieur"]
+DOMAINS = ["Sciences", "Lettres", "Droit"]
+DEPARTMENTS = ["Informatique", "Mathématiques", "Génie Civil", "Droit Public", "Histoire"]
+TUITIONS = [50000, 120000, 300000]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    """Snapshot of 60 programs (every fifth inactive) spread over every filter value"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Program(
+                code=f"P{i:03d}", name=f"{DEPARTMENTS[i % 5]} {i}", level=LEVELS[i % 3],
+                domain=DOMAINS[i % 3 if i % 7 else 0], department=DEPARTMENTS[i % 5],
+                description="Programme", required_bac_series=["C"], riasec_match="IRA",
+                registration_fee=50000, annual_tuition=TUITIONS[i % 4 % 3],
+                total_cost_3years=3 * TUITIONS[i % 4 % 3], capacity=50, is_active=i % 5 != 4
+            )
+            for i in range(60)
+        ])
+        db.commit()
+        yield load_catalog_snapshot(db, version=("test",))
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def test_cursor_pages_match_offset_pages(snapshot):
+    """Following next_cursor returns the same programs as offset pagination"""
+    for filters in ({}, {"level": "Licence"}, {"department": "info"}):
+        program_ids = snapshot.filter_ids(**filters)
+        offset_ids = [
+            item.id
+            for offset in range(0, len(program_ids), 7)
+            for item in build_program_page(snapshot, program_ids, offset, 7).programs
+        ]
+
+        cursor_ids, cursor = [], None
+        while True:
+            page = build_program_page(snapshot, program_ids, 0, 7, cursor)
+            cursor_ids += [item.id for item in page.programs]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert cursor_ids == offset_ids == list(program_ids), filters
+    print("✓ Cursor pages match offset pages")
+
+
+def test_cursor_round_trip_and_bad_cursor(snapshot):
+    """A cursor decodes to its sort key; a malformed one is a 400"""
+    sort_key = snapshot.sort_keys[snapshot.active_ids[3]]
+    assert decode_cursor(encode_cursor(sort_key)) == sort_key
+
+    for cursor in ("not-a-cursor", encode_cursor(("a", "b"))[:-2], "WzEsMiwzXQ"):
+        with pytest.raises(HTTPException) as error:
+            build_program_page(snapshot, snapshot.active_ids, 0, 10, cursor)
+        assert error.value.status_code == 400, cursor
+    print("✓ Cursor round trip, bad cursors rejected")
+
+
+def test_facet_counts_under_filters(snapshot):
+    """Each facet counts what the listing returns once that value is selected"""
+    filters = {"level": "Licence", "department": "info", "max_budget": 150000}
+    facets = snapshot.facets(**filters)
+
+    assert facets.total == len(snapshot.filter_ids(**filters))
+    for level, count in facets.level.items():
+        assert count == len(snapshot.filter_ids(**{**filters, "level": level})), level
+    for domain, count in facets.domain.items():
+        assert count == len(snapshot.filter_ids(**filters, domain=domain)), domain
+    for budget in facets.budget:
+        assert budget.count == len(snapshot.filter_ids(**{**filters, "max_budget": budget.max_budget}))
+    assert sum(facets.level.values()) == len(snapshot.filter_ids(department="info", max_budget=150000))
+    print("✓ Facet counts under filters")
+
+
+def test_misspelled_query_still_matches(snapshot):
+    """A query word with a typo finds the same programs, in the same order"""
+    exact, exact_total = snapshot.search("informatique")
+    typo, typo_total = snapshot.search("infromatique")
+
+    assert exact_total > 0
+    assert typo_total == exact_total
+    assert [item.id for item in typo] == [item.id for item in exact]
+    assert all(item.department == "Informatique" for item in typo)
+
+    # Every word must still match, typo or not
+    ranked, total = snapshot.search("infromatique 10")
+    assert total == 1 and ranked[0].name == "Informatique 10"
+    assert snapshot.search("xyzzy")[1] == 0
+    print("✓ Misspelled query still matches")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -8,15 +8,9 @@ from app.models.program import Program
 from app.models.recommendation import Recommendation
 from app.models.riasec_test import RiasecTest
 from app.models.professional_value import ProfessionalValue
+from app.utils.scoring import StudentContext, CatalogMatrix, score_catalog
 from sqlalchemy import desc
 
-# Import compatibility functions
-from app.api.v1.endpoints.programs import (
-    calculate_riasec_compatibility,
-    calculate_grades_compatibility,
-    calculate_values_compatibility
-)
-
 db = SessionLocal()
 
 try:
@@ -84,61 +78,25 @@ try:
     db.commit()
     print(f"\n[OK] Deleted {deleted} existing recommendations")
 
+    # Load grades and values once for all programs
+    context = StudentContext.load(db, student_profile, riasec_test)
+
     # Generate recommendations
     print(f"\n[INFO] Generating recommendations...")
     program_scores = []
 
-    for program in programs:
-        riasec_score = calculate_riasec_compatibility(
-            riasec_test.holland_code,
-            program.riasec_match
-        )
-
-        grades_score = calculate_grades_compatibility(
-            student_profile,
-            program,
-            db
-        )
-
-        values_score = calculate_values_compatibility(
-            student_profile,
-            program,
-            db
-        )
-
-        employment_score = int(program.employment_rate) if program.employment_rate else 50
-
-        financial_score = 50
-        if student_profile.max_annual_budget and program.annual_tuition:
-            try:
-                max_budget = student_profile.max_annual_budget
-                if program.annual_tuition <= max_budget * 0.7:
-                    financial_score = 100
-                elif program.annual_tuition <= max_budget:
-                    financial_score = 80
-                elif program.annual_tuition <= max_budget * 1.2:
-                    financial_score = 60
-                else:
-                    financial_score = 30
-            except:
-                financial_score = 50
-
-        total_score = int(
-            riasec_score * 0.30 +
-            grades_score * 0.30 +
-            values_score * 0.20 +
-            employment_score * 0.15 +
-            financial_score * 0.05
-        )
+    # Same kernel and weights as POST /recommendations/generate
+    scores = score_catalog(CatalogMatrix(programs), context)
 
+    for i, program in enumerate(programs):
         program_scores.append({
             'program': program,
-            'total_score': total_score,
-            'riasec_score': riasec_score,
-            'grades_score': grades_score,
-            'values_score': values_score,
-            'employment_score': employment_score,
-            'financial_score': financial_score
+            'total_score': int(scores['total'][i]),
+            'riasec_score': int(scores['riasec'][i]),
+            'grades_score': int(scores['grades'][i]),
+            'values_score': int(scores['values'][i]),
+            'employment_score': int(scores['employment'][i]),
+            'financial_score': int(scores['financial'][i])
         })
 
     # Sort by score
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+EXPLAIN test for the program filter indexes (alembic revision 2e670e21cc9d)
+Run with: TEST_DATABASE_URL=postgresql://... python test_program_indexes.py (or pytest)
+
+The indexes are PostgreSQL-specific: the test needs a PostgreSQL database
+where pg_trgm can be created, and is skipped without TEST_DATABASE_URL.
+Everything happens in a throwaway schema inside one transaction that is
+rolled back, so the database is left untouched.
+"""
+import importlib.util
+import os
+import sys
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+# The test opens its own engine: the app's (Supabase, SSL) is never used
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - register every table
+from app.models.program import Program
+
+SCHEMA = "test_program_indexes"
+MIGRATION = os.path.join(
+    BACKEND_DIR, "app", "db", "migrations", "versions",
+    "20261017_1200-2e670e21cc9d_add_program_filter_indexes.py"
+)
+
+DEPARTMENTS = ["Informatique", "Génie Civil", "Mathématiques", "Droit Public", "Économie", "Biologie"]
+RIASEC_CODES = ["IAS", "IRC", "RIA", "SAE", "ECS", "CSE", "AIS", "SEC"]
+
+
+def load_migration():
+    """The revision module (its file name is not importable as is)"""
+    spec = importlib.util.spec_from_file_location("add_program_filter_indexes", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed(session, count=2000):
+    """Programs spread over departments and RIASEC codes, 10% inactive"""
+    session.add_all([
+        Program(
+            code=f"P{i:05d}", name=f"Programme {i}", level="Licence",
+            department=DEPARTMENTS[i % len(DEPARTMENTS)] + f" {i % 50}",
+            description="Programme", required_bac_series=["C"],
+            riasec_match=RIASEC_CODES[i % len(RIASEC_CODES)],
+            registration_fee=50000, annual_tuition=100000, total_cost_3years=300000,
+            capacity=50, is_active=i % 10 != 0
+        )
+        for i in range(count)
+    ])
+    session.flush()
+
+
+def explain(conn, query) -> str:
+    """PostgreSQL plan of an ORM query, with its bound parameters"""
+    compiled = query.statement.compile(dialect=conn.dialect)
+    return "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params))
+
+
+def test_filter_queries_use_indexes():
+    """Listing order, RIASEC prefix and department substring go through their index"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL (PostgreSQL) not set")
+
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}, public"))
+            Program.__table__.create(bind=conn)
+
+            with Operations.context(MigrationContext.configure(conn)):
+                load_migration().upgrade()
+
+            session = Session(bind=conn)
+            seed(session)
+            conn.execute(text("ANALYZE programs"))
+            # A few thousand rows fit in a handful of pages: make the planner
+            # show whether an index can serve the query at all
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+            cases = [
+                (
+                    "ix_programs_active_department_name",
+                    session.query(Program.id).filter(Program.is_active == True)
+                    .order_by(Program.department, Program.name, Program.id).limit(50)
+                ),
+                (
+                    "ix_programs_riasec_match_pattern",
+                    session.query(Program.id).filter(Program.riasec_match.like("IA%"))
+                ),
+                (
+                    "ix_programs_department_trgm",
+                    session.query(Program.id).filter(Program.department.ilike("%info%"))
+                ),
+            ]
+            for index_name, query in cases:
+                plan = explain(conn, query)
+                assert index_name in plan, f"{index_name} not used:\n{plan}"
+                print(f"✓ {index_name} used")
+        finally:
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    if not TEST_DATABASE_URL:
+        print("⚠ TEST_DATABASE_URL (PostgreSQL) not set: skipped")
+        sys.exit(0)
+    test_filter_queries_use_indexes()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Query-count regression test for the recommendations listing
+Run with: python test_recommendation_queries.py (or pytest)
+
+Seeds a throwaway in-memory SQLite database, so it never touches Supabase.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import event
+
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401 - register every table
+from app.models.user import User
+from app.models.student_profile import StudentProfile
+from app.models.program import Program
+from app.models.recommendation import Recommendation
+from app.api.v1.endpoints.recommendations import (
+    build_recommendation_item,
+    load_programs_by_id,
+    load_recommendations
+)
+
+TOP_K = 20
+
+
+def seed(db):
+    """Create one student with TOP_K recommendations, half of them linked to a Master"""
+    user = User(email="queries@test.cm", password_hash="x", role="student")
+    db.add(user)
+    db.flush()
+
+    profile = StudentProfile(user_id=user.id, first_name="Test", last_name="Queries")
+    db.add(profile)
+    db.flush()
+
+    masters = []
+    for i in range(TOP_K // 2):
+        master = Program(
+            code=f"M{i:03d}", name=f"Master {i}", level="Master", department="Sciences",
+            description="Master", required_bac_series=["C"], riasec_match="IRA",
+            registration_fee=50000, annual_tuition=100000, total_cost_3years=300000, capacity=50
+        )
+        masters.append(master)
+    db.add_all(masters)
+    db.flush()
+
+    for i in range(TOP_K):
+        program = Program(
+            code=f"L{i:03d}", name=f"Licence {i}", level="Licence", department="Sciences",
+            description="Licence", required_bac_series=["C"], riasec_match="IRA",
+            registration_fee=50000, annual_tuition=100000, total_cost_3years=300000, capacity=50,
+            master_program_id=masters[i].id if i < len(masters) else None
+        )
+        db.add(program)
+        db.flush()
+        db.add(Recommendation(
+            student_id=profile.id, program_id=program.id, ranking=i + 1,
+            total_score=90 - i, riasec_score=80, grades_score=70, values_score=60,
+            employment_score=50, financial_score=50, strengths=[], weaknesses=[], advice=""
+        ))
+
+    db.commit()
+    return profile.id
+
+
+class QueryCounter:
+    """Count SQL statements sent to the engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def test_listing_is_a_single_query():
+    """GET /recommendations: recommendations, programs and masters in one query"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        student_id = seed(db)
+        db.expire_all()
+
+        with QueryCounter() as counter:
+            items = [
+                build_recommendation_item(rec, rec.program)
+                for rec in load_recommendations(db, student_id)
+            ]
+
+        assert len(items) == TOP_K
+        assert sum(1 for item in items if item.program.master_program) == TOP_K // 2
+        assert counter.count == 1, f"expected 1 query, got {counter.count}"
+        print(f"✓ Listing of {TOP_K} recommendations: {counter.count} query")
+
+        program_ids = [item.program_id for item in items]
+        db.expire_all()
+
+        with QueryCounter() as counter:
+            programs = load_programs_by_id(db, program_ids)
+            masters = [p.master_program for p in programs.values() if p.master_program_id]
+
+        assert len(programs) == TOP_K and len(masters) == TOP_K // 2
+        assert counter.count == 1, f"expected 1 query, got {counter.count}"
+        print(f"✓ Program lookup for generation: {counter.count} query")
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    test_listing_is_a_single_query()